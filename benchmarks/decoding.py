@@ -0,0 +1,57 @@
+import argparse
+import json
+import timeit
+
+from defisdk.serializers import defi_sdk_protocol_balance_to_entity, defi_sdk_protocol_balances_to_entity
+from defisdk.utils import hash_to_list
+
+from benchmarks.fixtures import protocol_balances_response
+
+SIZES = (1, 10, 50, 200)
+
+
+def words_decoder(data: str):
+    return hash_to_list(data, defi_sdk_protocol_balance_to_entity, dynamic_elements=True)
+
+
+def measure(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def run(number: int):
+    results = []
+    for protocols in SIZES:
+        data = protocol_balances_response(protocols)
+        assert words_decoder(data) == defi_sdk_protocol_balances_to_entity(data)
+        words = measure(lambda: words_decoder(data), number)
+        offsets = measure(lambda: defi_sdk_protocol_balances_to_entity(data), number)
+        results.append({
+            'protocols': protocols,
+            'response_bytes': len(data) // 2 - 1,
+            'words_seconds': words,
+            'offsets_seconds': offsets,
+            'speedup': words / offsets
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the word list and the offset based getBalances decoders')
+    parser.add_argument('--number', type=int, default=20)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    results = run(args.number)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(
+            f'{result["protocols"]:>4} protocols {result["response_bytes"]:>9} bytes  '
+            f'words {result["words_seconds"] * 1000:8.3f} ms  offsets {result["offsets_seconds"] * 1000:8.3f} ms  '
+            f'x{result["speedup"]:.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
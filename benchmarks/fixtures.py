@@ -0,0 +1,47 @@
+import random
+
+from defisdk.abi import encode_arguments
+
+# ABI types of the registry structs: tuples are python tuples, dynamic arrays are one-element lists
+TOKEN_METADATA = ('address', 'string', 'string', 'uint256')
+TOKEN_BALANCE = (TOKEN_METADATA, 'uint256')
+FULL_TOKEN_BALANCE = (TOKEN_BALANCE, [TOKEN_BALANCE])
+ADAPTER_BALANCE = (('address', 'string'), [FULL_TOKEN_BALANCE])
+PROTOCOL_METADATA = ('string', 'string', 'string', 'string', 'uint256')
+PROTOCOL_BALANCE = (PROTOCOL_METADATA, [ADAPTER_BALANCE])
+
+
+def random_address(r: random.Random) -> str:
+    return '0x' + bytes(r.getrandbits(8) for _ in range(20)).hex()
+
+
+def random_token_balance(r: random.Random, index: int) -> tuple:
+    metadata = (random_address(r), f'Token {index}', f'TKN{index}', r.choice((6, 8, 18)))
+    return metadata, r.randrange(10 ** 24)
+
+
+def random_protocol_balance(r: random.Random, index: int, adapters: int, assets: int) -> tuple:
+    metadata = (f'Protocol {index}', 'Description ' * 4, f'protocol{index}.fi', f'icons/{index}.png', index % 3)
+    return metadata, [
+        (
+            (random_address(r), r.choice(('Asset', 'Debt'))),
+            [(random_token_balance(r, i), [random_token_balance(r, i + 1)] * r.randrange(3)) for i in range(assets)]
+        )
+        for _ in range(adapters)
+    ]
+
+
+def protocol_balances_response(protocols: int, adapters: int = 2, assets: int = 4, seed: int = 0) -> str:
+    r = random.Random(seed)
+    balances = [random_protocol_balance(r, i, adapters, assets) for i in range(protocols)]
+    return '0x' + encode_arguments([[PROTOCOL_BALANCE]], [balances])
+
+
+def full_token_balance_response(underlying: int, seed: int = 0) -> str:
+    r = random.Random(seed)
+    full_token_balance = (random_token_balance(r, 0), [random_token_balance(r, i + 1) for i in range(underlying)])
+    return '0x' + encode_arguments([FULL_TOKEN_BALANCE], [full_token_balance])
+
+
+def protocol_names_response(protocols: int) -> str:
+    return '0x' + encode_arguments([['string']], [[f'Protocol {i}' for i in range(protocols)]])
@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import json
+import platform
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from defisdk.repositories import DeFiSDKAPIRepository
+from defisdk.version import __version__
+
+from benchmarks.fixtures import full_token_balance_response, protocol_balances_response, protocol_names_response
+
+ACCOUNT = '0x' + '11' * 20
+REGISTRY = '0x' + '22' * 20
+
+
+class ReplayRepository(DeFiSDKAPIRepository):
+    # answers every eth_call with the recorded response of its selector, so the whole request path runs offline
+
+    def __init__(self, responses: Dict[str, str], **kwargs):
+        super().__init__('http://localhost:8545/', defisdk_registry=REGISTRY, coalesce=False, **kwargs)
+        self.responses = responses
+
+    async def _post(self, url, headers=None, data=None):
+        return {'jsonrpc': '2.0', 'id': data['id'], 'result': self.responses[data['params'][0]['data'][:10]]}
+
+
+def cases(repository: DeFiSDKAPIRepository) -> List[Dict[str, Any]]:
+    return [
+        {
+            'name': f'getBalances/{protocols}',
+            'call': repository.account_balance_call(ACCOUNT),
+            'response': protocol_balances_response(protocols)
+        }
+        for protocols in (1, 10, 50)
+    ] + [
+        {
+            'name': 'getProtocolBalances/5',
+            'call': repository.protocol_balances_call(ACCOUNT, [f'Protocol {i}' for i in range(5)]),
+            'response': protocol_balances_response(5, seed=1)
+        },
+        {
+            'name': 'getFullTokenBalance/8',
+            'call': repository.full_token_balance_call('Curve pool token', ACCOUNT),
+            'response': full_token_balance_response(8)
+        },
+        {
+            'name': 'getProtocolNames/100',
+            'call': repository.protocol_names_call(),
+            'response': protocol_names_response(100)
+        }
+    ]
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def measure(call: Callable[[], Any], number: int, concurrency: int) -> Dict[str, float]:
+    latencies = []
+
+    async def timed():
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for first in range(0, number, concurrency):
+        await asyncio.gather(*[timed() for _ in range(min(concurrency, number - first))])
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    await call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'calls_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'peak_memory_bytes': peak
+    }
+
+
+async def run(number: int, concurrency: int) -> Dict[str, Any]:
+    repository = ReplayRepository({})
+    results = []
+    for case in cases(repository):
+        call = case['call']
+        repository.responses = {call.data[:10]: case['response']}
+        # replayed through the repository, so retries, limiters and node bookkeeping are part of the numbers
+        result = await measure(lambda: repository._call(call.to, call.data, call.serializer), number, concurrency)
+        results.append({'case': case['name'], 'response_bytes': len(case['response']) // 2 - 1, **result})
+    await repository.aclose()
+    return {
+        'version': __version__,
+        'python': platform.python_version(),
+        'number': number,
+        'concurrency': concurrency,
+        'results': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded registry responses through the request path')
+    parser.add_argument('--number', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+    if args.number < 1 or args.concurrency < 1:
+        parser.error('--number and --concurrency must be positive')
+
+    report = asyncio.run(run(args.number, args.concurrency))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for result in report['results']:
+        print(
+            f'{result["case"]:<24} {result["response_bytes"]:>8} bytes  {result["calls_per_second"]:>9.1f} calls/s  '
+            f'p50 {result["p50_ms"]:7.3f} ms  p99 {result["p99_ms"]:7.3f} ms  '
+            f'peak {result["peak_memory_bytes"] / 1024:8.1f} KiB'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,131 @@
-from typing import List, Union
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Iterable, List, Optional, Sequence, Tuple, Union
 
-from .entities import AdapterBalance, AssetBalance, ProtocolBalance, TokenBalance, TokenMetadata
+import aiohttp
+
+from .cache import BaseCache
+from .columnar import PortfolioColumns
+from .entities import (
+    AdapterBalance,
+    AssetBalance,
+    BalanceChange,
+    ContractCall,
+    ProtocolBalance,
+    RawBalance,
+    RegistrySnapshot,
+    TokenBalance,
+    TokenMetadata
+)
+from .enums import BalanceFormat
+from .instrumentation import CallMetrics, Hook, OpenTelemetryHook, PrometheusHook
+from .limiters import AdaptiveConcurrencyLimiter, RateLimiter
+from .policies import RetryPolicy
 from .repositories import DeFiSDKAPIRepository
-from .settings import DEFI_SDK_REGISTRY
+from .repositories.base import BaseTransport, RecordingTransport, ReplayTransport
+from .repositories.nodes import NodeEndpoint
+from .settings import (
+    BALANCES_CHUNK_SIZE,
+    BULK_CONCURRENCY,
+    DECODE_OFFLOAD_THRESHOLD,
+    DEFI_SDK_REGISTRY,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_CONNECTION_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    JSON_RPC_BATCH_SIZE,
+    MULTICALL_ADDRESS,
+    MULTICALL_SIZE,
+    WATCHER_POLL_INTERVAL
+)
+from .watcher import BalanceWatcher
 
 
 class DeFiSDK:
 
-    def __init__(self, ethereum_node_url: str, defisdk_registry: str = DEFI_SDK_REGISTRY):
-        self._repository = DeFiSDKAPIRepository(ethereum_node_url, defisdk_registry=defisdk_registry)
+    def __init__(
+            self,
+            ethereum_node_url: Union[str, Sequence[Union[str, NodeEndpoint]]],
+            defisdk_registry: str = DEFI_SDK_REGISTRY,
+            hedge_percentile: Optional[float] = None,
+            multicall: str = MULTICALL_ADDRESS,
+            multicall_size: int = MULTICALL_SIZE,
+            registry_cache_ttl: Optional[float] = None,
+            balance_format: BalanceFormat = BalanceFormat.Decimal,
+            balances_chunk_size: int = BALANCES_CHUNK_SIZE,
+            split_balances: bool = False,
+            active_adapters_rescan_interval: Optional[float] = None,
+            lazy_balances: bool = False,
+            session: Optional[aiohttp.ClientSession] = None,
+            connector: Optional[aiohttp.BaseConnector] = None,
+            connection_limit: int = HTTP_CONNECTION_LIMIT,
+            connection_limit_per_host: int = HTTP_CONNECTION_LIMIT_PER_HOST,
+            dns_cache_ttl: int = HTTP_DNS_CACHE_TTL,
+            keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+            transport: Optional[BaseTransport] = None,
+            batch_window: Optional[float] = None,
+            batch_size: int = JSON_RPC_BATCH_SIZE,
+            cache: Optional[BaseCache] = None,
+            latest_cache_ttl: float = 0,
+            retry_policy: Optional[RetryPolicy] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+            coalesce: bool = True,
+            hooks: Sequence[Hook] = (),
+            decode_executor: Optional[Executor] = None,
+            decode_offload_threshold: int = DECODE_OFFLOAD_THRESHOLD
+    ):
+        self._repository = DeFiSDKAPIRepository(
+            ethereum_node_url,
+            defisdk_registry=defisdk_registry,
+            hedge_percentile=hedge_percentile,
+            multicall=multicall,
+            multicall_size=multicall_size,
+            registry_cache_ttl=registry_cache_ttl,
+            balance_format=balance_format,
+            balances_chunk_size=balances_chunk_size,
+            split_balances=split_balances,
+            active_adapters_rescan_interval=active_adapters_rescan_interval,
+            lazy_balances=lazy_balances,
+            session=session,
+            connector=connector,
+            connection_limit=connection_limit,
+            connection_limit_per_host=connection_limit_per_host,
+            dns_cache_ttl=dns_cache_ttl,
+            keepalive_timeout=keepalive_timeout,
+            transport=transport,
+            batch_window=batch_window,
+            batch_size=batch_size,
+            cache=cache,
+            latest_cache_ttl=latest_cache_ttl,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            concurrency_limiter=concurrency_limiter,
+            coalesce=coalesce,
+            hooks=hooks,
+            decode_executor=decode_executor,
+            decode_offload_threshold=decode_offload_threshold
+        )
+
+    def batch(self, window: float = 0, max_size: Optional[int] = None):
+        return self._repository.batch(window, max_size)
+
+    async def warm_registry(self) -> RegistrySnapshot:
+        return await self._repository.warm_registry()
+
+    def invalidate_registry(self):
+        self._repository.invalidate_registry()
+
+    def invalidate_active_adapters(self, address: Optional[str] = None):
+        self._repository.invalidate_active_adapters(address)
+
+    async def aclose(self):
+        await self._repository.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
 
     async def get_account_balance(
             self,
@@ -17,6 +134,47 @@ class DeFiSDK:
     ) -> List[ProtocolBalance]:
         return await self._repository.get_account_balance(address, block)
 
+    def get_account_balances(
+            self,
+            addresses: Iterable[str],
+            block: Union[str, int] = 'latest',
+            concurrency: int = BULK_CONCURRENCY,
+            ordered: bool = False,
+            return_exceptions: bool = True
+    ) -> AsyncIterator[Tuple[str, Union[List[ProtocolBalance], Exception]]]:
+        return self._repository.get_account_balances(addresses, block, concurrency, ordered, return_exceptions)
+
+    def scan_account_balances(
+            self,
+            address: str,
+            start_block: int,
+            end_block: int,
+            step: int = 1,
+            concurrency: int = BULK_CONCURRENCY,
+            checkpoint: Optional[BaseCache] = None,
+            return_exceptions: bool = True
+    ) -> AsyncIterator[Tuple[int, Union[List[ProtocolBalance], Exception]]]:
+        return self._repository.scan_account_balances(
+            address, start_block, end_block, step, concurrency, checkpoint, return_exceptions
+        )
+
+    async def get_account_balances_columns(
+            self,
+            addresses: Iterable[str],
+            block: Union[str, int] = 'latest',
+            concurrency: int = BULK_CONCURRENCY,
+            columns: Optional[PortfolioColumns] = None
+    ) -> PortfolioColumns:
+        return await self._repository.get_account_balances_columns(addresses, block, concurrency, columns)
+
+    def watch_account_balances(
+            self,
+            addresses: Iterable[str],
+            poll_interval: float = WATCHER_POLL_INTERVAL,
+            concurrency: int = BULK_CONCURRENCY
+    ) -> BalanceWatcher:
+        return self._repository.watch_account_balances(addresses, poll_interval, concurrency)
+
     async def get_adapter_balance(
             self,
             address: str,
@@ -33,6 +191,22 @@ class DeFiSDK:
     ) -> ProtocolBalance:
         return await self._repository.get_protocol_balance(address, protocol_name, block)
 
+    async def get_adapter_balances(
+            self,
+            address: str,
+            adapters: Sequence[str],
+            block: Union[str, int] = 'latest'
+    ) -> List[AdapterBalance]:
+        return await self._repository.get_adapter_balances(address, adapters, block)
+
+    async def get_protocol_balances(
+            self,
+            address: str,
+            protocol_names: Sequence[str],
+            block: Union[str, int] = 'latest'
+    ) -> List[ProtocolBalance]:
+        return await self._repository.get_protocol_balances(address, protocol_names, block)
+
     async def get_protocol_names(
             self,
             block: Union[str, int] = 'latest'
@@ -98,3 +272,43 @@ class DeFiSDK:
             block: Union[str, int] = 'latest'
     ) -> TokenMetadata:
         return await self._repository.get_token_metadata(token_type, token_address, block)
+
+    async def aggregate(
+            self,
+            calls: List[ContractCall],
+            block: Union[str, int] = 'latest'
+    ) -> List[Any]:
+        return await self._repository.aggregate(calls, block)
+
+    def account_balance_call(self, address: str) -> ContractCall:
+        return self._repository.account_balance_call(address)
+
+    def adapter_balance_call(self, address: str, adapter: str) -> ContractCall:
+        return self._repository.adapter_balance_call(address, adapter)
+
+    def protocol_balance_call(self, address: str, protocol_name: str) -> ContractCall:
+        return self._repository.protocol_balance_call(address, protocol_name)
+
+    def adapter_balances_call(self, address: str, adapters: Sequence[str]) -> ContractCall:
+        return self._repository.adapter_balances_call(address, adapters)
+
+    def protocol_balances_call(self, address: str, protocol_names: Sequence[str]) -> ContractCall:
+        return self._repository.protocol_balances_call(address, protocol_names)
+
+    def protocol_names_call(self) -> ContractCall:
+        return self._repository.protocol_names_call()
+
+    def token_adapter_names_call(self) -> ContractCall:
+        return self._repository.token_adapter_names_call()
+
+    def protocol_adapter_names_call(self, protocol_name: str) -> ContractCall:
+        return self._repository.protocol_adapter_names_call(protocol_name)
+
+    def token_adapter_call(self, token_adapter_name: str) -> ContractCall:
+        return self._repository.token_adapter_call(token_adapter_name)
+
+    def full_token_balance_call(self, token_type: str, token_address: str) -> ContractCall:
+        return self._repository.full_token_balance_call(token_type, token_address)
+
+    def final_full_token_balance_call(self, token_type: str, token_address: str) -> ContractCall:
+        return self._repository.final_full_token_balance_call(token_type, token_address)
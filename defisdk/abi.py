@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from defisdk.utils import get_signature_hash, remove_0x_prefix
+
+# ABI types: elementary types are strings ('address', 'uint256', 'bool', 'string', 'bytes'), tuples are python
+# tuples of types, dynamic arrays are one-element lists ([('address', 'bytes')]) or 'T[]' strings and fixed-size
+# arrays are FixedArray(element type, length) or 'T[k]' strings.
+# Encoders produce hex without the 0x prefix, so call data is assembled by plain string concatenation.
+Encoder = Callable[[Any], str]
+
+# '0x' selector -> function name of every FunctionEncoder, for metrics and debugging
+FUNCTION_NAMES: Dict[str, str] = {}
+
+
+@dataclass(frozen=True)
+class FixedArray:
+    element_type: Any
+    length: int
+
+
+def function_selector(signature: str) -> str:
+    return remove_0x_prefix(get_signature_hash(signature.encode()))
+
+
+def parse_types(types: str) -> Tuple[Any, ...]:
+    try:
+        parsed, position = _parse_tuple(types, 0)
+    except (IndexError, ValueError):
+        raise ValueError(f'Invalid ABI types: {types}')
+    if position != len(types):
+        raise ValueError(f'Invalid ABI types: {types}')
+    return parsed
+
+
+def _parse_tuple(types: str, position: int) -> Tuple[Tuple[Any, ...], int]:
+    # position points at the opening parenthesis
+    result: List[Any] = []
+    position += 1
+    while types[position] != ')':
+        if types[position] == '(':
+            element_type, position = _parse_tuple(types, position)
+        else:
+            end = position
+            while types[end] not in ',()[':
+                end += 1
+            element_type, position = types[position:end], end
+        while types[position] == '[':
+            end = types.index(']', position)
+            length = types[position + 1:end]
+            element_type = FixedArray(element_type, int(length)) if length else [element_type]
+            position = end + 1
+        result.append(element_type)
+        if types[position] == ',':
+            position += 1
+    return tuple(result), position + 1
+
+
+def array_type(abi_type: Any) -> Optional[Tuple[Any, Optional[int]]]:
+    # (element type, length) of array types, the length is None for dynamic arrays
+    if isinstance(abi_type, list):
+        return abi_type[0], None
+    if isinstance(abi_type, FixedArray):
+        return abi_type.element_type, abi_type.length
+    if isinstance(abi_type, str) and abi_type.endswith(']'):
+        element_type, _, length = abi_type[:-1].rpartition('[')
+        return element_type, int(length) if length else None
+    return None
+
+
+def is_dynamic(abi_type: Any) -> bool:
+    if isinstance(abi_type, tuple):
+        return any(is_dynamic(element_type) for element_type in abi_type)
+    array = array_type(abi_type)
+    if array is not None:
+        return array[1] is None or is_dynamic(array[0])
+    return abi_type in ('string', 'bytes')
+
+
+def head_size(abi_type: Any) -> int:
+    # static tuples and fixed-size arrays are encoded in place, everything else takes one word
+    if is_dynamic(abi_type):
+        return 32
+    if isinstance(abi_type, tuple):
+        return sum(head_size(element_type) for element_type in abi_type)
+    array = array_type(abi_type)
+    if array is not None:
+        return array[1] * head_size(array[0])
+    return 32
+
+
+def encode_int(value: int) -> str:
+    return format(value % 2 ** 256, '064x')
+
+
+def encode_bool(value: bool) -> str:
+    return encode_int(int(value))
+
+
+def encode_address(value: str) -> str:
+    return remove_0x_prefix(value).zfill(64)
+
+
+def encode_bytes(value: Union[bytes, str]) -> str:
+    # call data is usually already hex
+    value = value.hex() if isinstance(value, bytes) else remove_0x_prefix(value)
+    return encode_int(len(value) // 2) + value.ljust((len(value) + 63) // 64 * 64, '0')
+
+
+@lru_cache(maxsize=4096)
+def encode_string(value: str) -> str:
+    # protocol, adapter and token type names repeat on every call
+    return encode_bytes(value.encode())
+
+
+def compile_encoder(abi_type: Any) -> Encoder:
+    if isinstance(abi_type, tuple):
+        if not is_dynamic(abi_type):
+            return partial(_encode_static_sequence, tuple(compile_encoder(t) for t in abi_type))
+        return partial(
+            _encode_sequence,
+            tuple((is_dynamic(t), compile_encoder(t)) for t in abi_type),
+            sum(head_size(t) for t in abi_type)
+        )
+    array = array_type(abi_type)
+    if array is not None:
+        element_type, length = array
+        if length is None:
+            return partial(_encode_array, is_dynamic(element_type), compile_encoder(element_type))
+        return partial(_encode_fixed_array, length, is_dynamic(element_type), compile_encoder(element_type))
+    if abi_type == 'address':
+        return encode_address
+    if abi_type == 'string':
+        return encode_string
+    if abi_type == 'bytes':
+        return encode_bytes
+    if abi_type == 'bool':
+        return encode_bool
+    if abi_type.startswith(('uint', 'int')):
+        return encode_int
+    raise ValueError(f'Unsupported ABI type: {abi_type}')
+
+
+def _encode_static_sequence(encoders: Tuple[Encoder, ...], values: Sequence[Any]) -> str:
+    return ''.join([encoder(value) for encoder, value in zip(encoders, values)])
+
+
+def _encode_sequence(encoders: Tuple[Tuple[bool, Encoder], ...], tails_start: int, values: Sequence[Any]) -> str:
+    heads = []
+    tails = []
+    position = tails_start
+    for (dynamic, encoder), value in zip(encoders, values):
+        data = encoder(value)
+        if dynamic:
+            heads.append(format(position, '064x'))
+            tails.append(data)
+            position += len(data) // 2
+        else:
+            heads.append(data)
+    heads.extend(tails)
+    return ''.join(heads)
+
+
+def _encode_array(dynamic_elements: bool, encoder: Encoder, values: Sequence[Any]) -> str:
+    if not dynamic_elements:
+        return encode_int(len(values)) + ''.join([encoder(value) for value in values])
+    return encode_int(len(values)) + _encode_sequence(((True, encoder),) * len(values), 32 * len(values), values)
+
+
+def _encode_fixed_array(length: int, dynamic_elements: bool, encoder: Encoder, values: Sequence[Any]) -> str:
+    if len(values) != length:
+        raise ValueError(f'Expected {length} values for a fixed-size array, got {len(values)}')
+    if not dynamic_elements:
+        return ''.join([encoder(value) for value in values])
+    return _encode_sequence(((True, encoder),) * length, 32 * length, values)
+
+
+def encode(abi_type: Any, value: Any) -> str:
+    return compile_encoder(abi_type)(value)
+
+
+def encode_arguments(abi_types: Sequence[Any], values: Sequence[Any]) -> str:
+    return compile_encoder(tuple(abi_types))(values)
+
+
+class FunctionEncoder:
+    __slots__ = ('signature', 'selector', '_encoder')
+
+    def __init__(self, signature: str):
+        self.signature = signature
+        self.selector = '0x' + function_selector(signature)
+        self._encoder = compile_encoder(parse_types(signature[signature.index('('):]))
+        FUNCTION_NAMES[self.selector] = signature[:signature.index('(')]
+
+    def __call__(self, *values: Any) -> str:
+        return self.selector + self._encoder(values)
@@ -0,0 +1,121 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class BaseCache:
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class LRUCache(BaseCache):
+
+    def __init__(self, max_size: int = 10000, max_bytes: Optional[int] = None):
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._entries: 'OrderedDict[str, Tuple[str, Optional[float]]]' = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        if key in self._entries:
+            self._remove(key)
+        size = len(key) + len(value)
+        if self._max_bytes is not None and size > self._max_bytes:
+            return
+        self._entries[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._bytes += size
+        while len(self._entries) > self._max_size or (self._max_bytes is not None and self._bytes > self._max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+
+
+class SQLiteCache(BaseCache):
+    # the cache is used on the event loop thread, so writes are committed in batches rather than one fsync per entry.
+    # Writes since the last commit are lost if the process dies without close() or flush().
+
+    def __init__(self, path: str, commit_interval: float = 1.0, commit_size: int = 1000):
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'
+        )
+        self._connection.commit()
+        self._commit_interval = commit_interval
+        self._commit_size = commit_size
+        self._pending = 0
+        self._committed_at = time.monotonic()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connection.execute('SELECT value, expires_at FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        # wall clock here, unlike LRUCache, because entries outlive the process
+        if expires_at is not None and expires_at <= time.time():
+            self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._written()
+            return None
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._connection.execute(
+            'INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)', (key, value, expires_at)
+        )
+        self._written()
+
+    def _written(self):
+        self._pending += 1
+        if self._pending >= self._commit_size or time.monotonic() - self._committed_at >= self._commit_interval:
+            self.flush()
+
+    def clear(self):
+        self._connection.execute('DELETE FROM responses')
+        self.flush()
+
+    def flush(self):
+        self._connection.commit()
+        self._pending = 0
+        self._committed_at = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._connection.close()
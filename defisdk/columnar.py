@@ -0,0 +1,164 @@
+import csv
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Union
+
+from defisdk.decoder import hash_to_bytes, read_address, read_int, read_offsets, read_string
+from defisdk.entities import ProtocolBalance, RawBalance
+from defisdk.utils import DECIMAL_CONTEXT
+
+COLUMNS = (
+    'account',
+    'protocol',
+    'adapter_address',
+    'adapter_type',
+    'token_address',
+    'underlying_token',
+    'raw_amount',
+    'decimals',
+    'block',
+)
+
+
+class PortfolioColumns:
+
+    def __init__(self):
+        self.account: List[str] = []
+        self.protocol: List[str] = []
+        self.adapter_address: List[str] = []
+        self.adapter_type: List[str] = []
+        self.token_address: List[str] = []
+        # None for the asset's own (base token) row, the underlying token address for its component rows
+        self.underlying_token: List[Optional[str]] = []
+        self.raw_amount: List[int] = []
+        self.decimals: List[int] = []
+        self.block: List[Optional[int]] = []
+        self.errors: Dict[str, Exception] = {}
+
+    def __len__(self):
+        return len(self.account)
+
+    def append(
+            self,
+            account: str,
+            protocol: str,
+            adapter_address: str,
+            adapter_type: str,
+            token_address: str,
+            underlying_token: Optional[str],
+            raw_amount: int,
+            decimals: int,
+            block: Optional[int]
+    ):
+        self.account.append(account)
+        self.protocol.append(protocol)
+        self.adapter_address.append(adapter_address)
+        self.adapter_type.append(adapter_type)
+        self.token_address.append(token_address)
+        self.underlying_token.append(underlying_token)
+        self.raw_amount.append(raw_amount)
+        self.decimals.append(decimals)
+        self.block.append(block)
+
+    def extend_from_response(self, account: str, passed_hash: str, block: Optional[int] = None):
+        # walks a getBalances/getProtocolBalances response without building the entity tree
+        data = hash_to_bytes(passed_hash)
+        if not data:
+            return
+        for protocol_offset in read_offsets(data, read_int(data, 0)):
+            protocol_metadata = protocol_offset + read_int(data, protocol_offset)
+            protocol = read_string(data, protocol_metadata + read_int(data, protocol_metadata))
+            for adapter_offset in read_offsets(data, protocol_offset + read_int(data, protocol_offset + 32)):
+                adapter_metadata = adapter_offset + read_int(data, adapter_offset)
+                adapter_address = read_address(data, adapter_metadata)
+                adapter_type = read_string(data, adapter_metadata + read_int(data, adapter_metadata + 32))
+                for asset_offset in read_offsets(data, adapter_offset + read_int(data, adapter_offset + 32)):
+                    base = asset_offset + read_int(data, asset_offset)
+                    base_metadata = base + read_int(data, base)
+                    token_address = read_address(data, base_metadata)
+                    self.append(
+                        account, protocol, adapter_address, adapter_type, token_address, None,
+                        read_int(data, base + 32), read_int(data, base_metadata + 96), block
+                    )
+                    for underlying in read_offsets(data, asset_offset + read_int(data, asset_offset + 32)):
+                        underlying_metadata = underlying + read_int(data, underlying)
+                        self.append(
+                            account, protocol, adapter_address, adapter_type, token_address,
+                            read_address(data, underlying_metadata),
+                            read_int(data, underlying + 32), read_int(data, underlying_metadata + 96), block
+                        )
+
+    def extend_from_entities(self, account: str, balances: List[ProtocolBalance], block: Optional[int] = None):
+        for protocol_balance in balances:
+            protocol = protocol_balance.metadata.name
+            for adapter_balance in protocol_balance.adapter_balances:
+                adapter_address = adapter_balance.metadata.address
+                adapter_type = adapter_balance.metadata.type
+                for asset_balance in adapter_balance.asset_balances:
+                    base = asset_balance.base_token_balance
+                    token_address = base.metadata.address
+                    for token_balance in (base, *asset_balance.underlying_token_balances):
+                        self.append(
+                            account, protocol, adapter_address, adapter_type, token_address,
+                            None if token_balance is base else token_balance.metadata.address,
+                            _raw_amount(token_balance.balance, token_balance.metadata.decimals),
+                            token_balance.metadata.decimals,
+                            block
+                        )
+
+    def to_dict(self) -> Dict[str, list]:
+        return {column: getattr(self, column) for column in COLUMNS}
+
+    def to_numpy(self) -> Dict[str, Any]:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('numpy is required for PortfolioColumns.to_numpy(), install defisdk[numpy]')
+        return {
+            'account': numpy.array(self.account, dtype=object),
+            'protocol': numpy.array(self.protocol, dtype=object),
+            'adapter_address': numpy.array(self.adapter_address, dtype=object),
+            'adapter_type': numpy.array(self.adapter_type, dtype=object),
+            'token_address': numpy.array(self.token_address, dtype=object),
+            'underlying_token': numpy.array(self.underlying_token, dtype=object),
+            # uint256 amounts do not fit any fixed-width dtype
+            'raw_amount': numpy.array(self.raw_amount, dtype=object),
+            'decimals': numpy.array(self.decimals, dtype=numpy.uint8),
+            'block': numpy.array(self.block, dtype=object),
+        }
+
+    def to_arrow(self):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError('pyarrow is required for PortfolioColumns.to_arrow(), install defisdk[arrow]')
+        return pyarrow.table({
+            'account': pyarrow.array(self.account, pyarrow.string()),
+            'protocol': pyarrow.array(self.protocol, pyarrow.string()),
+            'adapter_address': pyarrow.array(self.adapter_address, pyarrow.string()),
+            'adapter_type': pyarrow.array(self.adapter_type, pyarrow.string()),
+            'token_address': pyarrow.array(self.token_address, pyarrow.string()),
+            'underlying_token': pyarrow.array(self.underlying_token, pyarrow.string()),
+            # uint256 amounts can exceed decimal256 precision, so they are kept as exact decimal strings
+            'raw_amount': pyarrow.array([str(amount) for amount in self.raw_amount], pyarrow.string()),
+            'decimals': pyarrow.array(self.decimals, pyarrow.uint8()),
+            'block': pyarrow.array(self.block, pyarrow.uint64()),
+        })
+
+    def to_parquet(self, path: str):
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('pyarrow is required for PortfolioColumns.to_parquet(), install defisdk[arrow]')
+        pyarrow.parquet.write_table(self.to_arrow(), path)
+
+    def to_csv(self, path: str):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(zip(*(getattr(self, column) for column in COLUMNS)))
+
+
+def _raw_amount(balance: Union[Decimal, RawBalance], decimals: int) -> int:
+    if isinstance(balance, RawBalance):
+        return balance.amount
+    return int(balance.scaleb(decimals, DECIMAL_CONTEXT))
@@ -0,0 +1,55 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Tuple, TypeVar, Union
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+async def bounded_map(
+        func: Callable[[T], Awaitable[R]],
+        items: Iterable[T],
+        concurrency: int,
+        ordered: bool = False,
+        return_exceptions: bool = True
+) -> AsyncIterator[Tuple[T, Union[R, Exception]]]:
+    if concurrency < 1:
+        raise ValueError(f'Concurrency must be at least 1, got {concurrency}')
+    items = iter(items)
+    pending: Dict[asyncio.Future, Tuple[int, T]] = {}
+    # in ordered mode finished results wait here for their predecessors and count against the concurrency window
+    finished: Dict[int, Tuple[T, Union[R, Exception]]] = {}
+    next_index = 0
+    yield_index = 0
+
+    try:
+        while True:
+            while len(pending) + len(finished) < concurrency:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                pending[asyncio.ensure_future(func(item))] = (next_index, item)
+                next_index += 1
+
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                index, item = pending.pop(future)
+                result = future.exception()
+                if result is None:
+                    result = future.result()
+                elif not return_exceptions:
+                    raise result
+                if ordered:
+                    finished[index] = (item, result)
+                else:
+                    yield item, result
+
+            while yield_index in finished:
+                yield finished.pop(yield_index)
+                yield_index += 1
+    finally:
+        for future in pending:
+            future.cancel()
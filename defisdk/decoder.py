@@ -0,0 +1,173 @@
+from functools import partial
+from typing import Any, Callable, List, Tuple
+
+from defisdk.entities import (
+    AdapterBalance,
+    AdapterMetadata,
+    AssetBalance,
+    ProtocolBalance,
+    ProtocolMetadata,
+    TokenBalance,
+    TokenMetadata,
+    intern_adapter_metadata,
+    intern_protocol_metadata,
+    intern_token_metadata
+)
+from defisdk.utils import int_to_decimal, remove_0x_prefix
+
+AmountConverter = Callable[[int, int], Any]
+
+
+def hash_to_bytes(passed_hash: str) -> bytes:
+    return bytes.fromhex(remove_0x_prefix(passed_hash))
+
+
+def read_int(data: bytes, offset: int) -> int:
+    return int.from_bytes(data[offset:offset + 32], 'big')
+
+
+def read_bool(data: bytes, offset: int) -> bool:
+    return read_int(data, offset) != 0
+
+
+def read_address(data: bytes, offset: int) -> str:
+    return '0x' + data[offset + 12:offset + 32].hex()
+
+
+def read_bytes(data: bytes, offset: int) -> bytes:
+    length = read_int(data, offset)
+    return data[offset + 32:offset + 32 + length]
+
+
+def read_string(data: bytes, offset: int) -> str:
+    return read_bytes(data, offset).decode()
+
+
+def read_offsets(data: bytes, offset: int) -> List[int]:
+    length = read_int(data, offset)
+    start = offset + 32
+    return [start + read_int(data, start + 32 * i) for i in range(length)]
+
+
+def read_array(
+        data: bytes,
+        offset: int,
+        decoder: Callable[[bytes, int], Any],
+        dynamic_elements: bool = False
+) -> List[Any]:
+    length = read_int(data, offset)
+    start = offset + 32
+    if dynamic_elements:
+        return [decoder(data, start + read_int(data, start + 32 * i)) for i in range(length)]
+    return [decoder(data, start + 32 * i) for i in range(length)]
+
+
+def read_tuple(
+        data: bytes,
+        offset: int,
+        decoder: Callable[[bytes, int], Any],
+        dynamic_elements: bool = False
+) -> Tuple[Any, ...]:
+    return tuple(read_array(data, offset, decoder, dynamic_elements))
+
+
+def read_token_metadata(data: bytes, offset: int) -> TokenMetadata:
+    return intern_token_metadata(
+        address=read_address(data, offset),
+        name=read_string(data, offset + read_int(data, offset + 32)),
+        symbol=read_string(data, offset + read_int(data, offset + 64)),
+        decimals=read_int(data, offset + 96)
+    )
+
+
+def read_token_balance(
+        data: bytes,
+        offset: int,
+        decimal_shift: int = 0,
+        amount_converter: AmountConverter = int_to_decimal
+) -> TokenBalance:
+    metadata = read_token_metadata(data, offset + read_int(data, offset))
+    return TokenBalance(
+        metadata=metadata,
+        balance=amount_converter(read_int(data, offset + 32), metadata.decimals + decimal_shift)
+    )
+
+
+def read_asset_balance(
+        data: bytes,
+        offset: int,
+        rate: bool = False,
+        amount_converter: AmountConverter = int_to_decimal
+) -> AssetBalance:
+    base_balance = read_token_balance(data, offset + read_int(data, offset), amount_converter=amount_converter)
+    decimal_shift = 18 - base_balance.metadata.decimals if rate else 0
+    underlying_balances = read_tuple(
+        data,
+        offset + read_int(data, offset + 32),
+        partial(read_token_balance, decimal_shift=decimal_shift, amount_converter=amount_converter),
+        dynamic_elements=True
+    )
+    return AssetBalance(
+        base_token_balance=base_balance,
+        underlying_token_balances=underlying_balances
+    )
+
+
+def read_adapter_metadata(data: bytes, offset: int) -> AdapterMetadata:
+    return intern_adapter_metadata(
+        address=read_address(data, offset),
+        type=read_string(data, offset + read_int(data, offset + 32))
+    )
+
+
+def read_adapter_balance(
+        data: bytes,
+        offset: int,
+        amount_converter: AmountConverter = int_to_decimal
+) -> AdapterBalance:
+    return AdapterBalance(
+        metadata=read_adapter_metadata(data, offset + read_int(data, offset)),
+        asset_balances=read_tuple(
+            data,
+            offset + read_int(data, offset + 32),
+            partial(read_asset_balance, amount_converter=amount_converter),
+            dynamic_elements=True
+        )
+    )
+
+
+def read_protocol_metadata(data: bytes, offset: int) -> ProtocolMetadata:
+    return intern_protocol_metadata(
+        name=read_string(data, offset + read_int(data, offset)),
+        description=read_string(data, offset + read_int(data, offset + 32)),
+        website_url=read_string(data, offset + read_int(data, offset + 64)),
+        icon_url=read_string(data, offset + read_int(data, offset + 96)),
+        version=read_int(data, offset + 128)
+    )
+
+
+def read_protocol_balance(
+        data: bytes,
+        offset: int,
+        amount_converter: AmountConverter = int_to_decimal
+) -> ProtocolBalance:
+    return ProtocolBalance(
+        metadata=read_protocol_metadata(data, offset + read_int(data, offset)),
+        adapter_balances=read_tuple(
+            data,
+            offset + read_int(data, offset + 32),
+            partial(read_adapter_balance, amount_converter=amount_converter),
+            dynamic_elements=True
+        )
+    )
+
+
+def read_multicall_result(data: bytes, offset: int) -> Tuple[bool, bytes]:
+    return read_bool(data, offset), read_bytes(data, offset + read_int(data, offset + 32))
+
+
+def decode_list(passed_hash: str, decoder: Callable[[bytes, int], Any], dynamic_elements: bool = False) -> List[Any]:
+    data = hash_to_bytes(passed_hash)
+    if not data:
+        return []
+    return read_array(data, read_int(data, 0), decoder, dynamic_elements)
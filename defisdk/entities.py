@@ -1,55 +1,152 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from decimal import Decimal
-from typing import List
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from weakref import WeakValueDictionary
 
 from .constants import ZERO_ADDRESS
+from .utils import int_to_decimal
+
+
+class Entity:
+    __slots__ = ()
+
+    # frozen dataclasses with __slots__ can't restore their state through setattr, so pickle by constructor args.
+    # Metadata is unpickled through the intern functions, so trees decoded in another process share it again.
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, f.name) for f in fields(self))
 
 
 @dataclass(eq=True, frozen=True)
-class TokenMetadata:
+class TokenMetadata(Entity):
+    __slots__ = ('address', 'name', 'symbol', 'decimals', '__weakref__')
     address: str
     name: str
     symbol: str
     decimals: int
 
+    def __reduce__(self):
+        return intern_token_metadata, (self.address, self.name, self.symbol, self.decimals)
+
+
+class RawBalance(NamedTuple):
+    amount: int
+    decimals: int
+
+    def to_decimal(self) -> Decimal:
+        return int_to_decimal(self.amount, self.decimals)
+
 
 @dataclass(eq=True, frozen=True)
-class TokenBalance:
+class TokenBalance(Entity):
+    __slots__ = ('metadata', 'balance')
     metadata: TokenMetadata
-    balance: Decimal
+    balance: Union[Decimal, RawBalance]
 
 
 @dataclass(eq=True, frozen=True)
-class AssetBalance:
+class AssetBalance(Entity):
+    __slots__ = ('base_token_balance', 'underlying_token_balances')
     base_token_balance: TokenBalance
-    underlying_token_balances: List[TokenBalance]
+    underlying_token_balances: Tuple[TokenBalance, ...]
 
 
 @dataclass(eq=True, frozen=True)
-class AdapterMetadata:
+class AdapterMetadata(Entity):
+    __slots__ = ('address', 'type', '__weakref__')
     address: str
     type: str
 
+    def __reduce__(self):
+        return intern_adapter_metadata, (self.address, self.type)
+
 
 @dataclass(eq=True, frozen=True)
-class AdapterBalance:
+class AdapterBalance(Entity):
+    __slots__ = ('metadata', 'asset_balances')
     metadata: AdapterMetadata
-    asset_balances: List[AssetBalance]
+    asset_balances: Tuple[AssetBalance, ...]
 
 
 @dataclass(eq=True, frozen=True)
-class ProtocolMetadata:
+class ProtocolMetadata(Entity):
+    __slots__ = ('name', 'description', 'website_url', 'icon_url', 'version', '__weakref__')
     name: str
     description: str
     website_url: str
     icon_url: str
     version: int
 
+    def __reduce__(self):
+        return intern_protocol_metadata, (self.name, self.description, self.website_url, self.icon_url, self.version)
+
 
 @dataclass(eq=True, frozen=True)
-class ProtocolBalance:
+class ProtocolBalance(Entity):
+    __slots__ = ('metadata', 'adapter_balances')
     metadata: ProtocolMetadata
-    adapter_balances: List[AdapterBalance]
+    adapter_balances: Tuple[AdapterBalance, ...]
+
+
+_token_metadata: 'WeakValueDictionary[tuple, TokenMetadata]' = WeakValueDictionary()
+_adapter_metadata: 'WeakValueDictionary[tuple, AdapterMetadata]' = WeakValueDictionary()
+_protocol_metadata: 'WeakValueDictionary[tuple, ProtocolMetadata]' = WeakValueDictionary()
+
+
+def intern_token_metadata(address: str, name: str, symbol: str, decimals: int) -> TokenMetadata:
+    key = (address, name, symbol, decimals)
+    metadata = _token_metadata.get(key)
+    if metadata is None:
+        metadata = _token_metadata[key] = TokenMetadata(address, name, symbol, decimals)
+    return metadata
+
+
+def intern_adapter_metadata(address: str, type: str) -> AdapterMetadata:
+    key = (address, type)
+    metadata = _adapter_metadata.get(key)
+    if metadata is None:
+        metadata = _adapter_metadata[key] = AdapterMetadata(address, type)
+    return metadata
+
+
+def intern_protocol_metadata(
+        name: str,
+        description: str,
+        website_url: str,
+        icon_url: str,
+        version: int
+) -> ProtocolMetadata:
+    key = (name, description, website_url, icon_url, version)
+    metadata = _protocol_metadata.get(key)
+    if metadata is None:
+        metadata = _protocol_metadata[key] = ProtocolMetadata(name, description, website_url, icon_url, version)
+    return metadata
+
+
+@dataclass(eq=True, frozen=True)
+class RegistrySnapshot:
+    block: int
+    protocol_names: List[str]
+    token_adapter_names: List[str]
+    protocol_adapter_names: Dict[str, List[str]]
+    token_adapters: Dict[str, str]
+
+
+@dataclass(eq=True, frozen=True)
+class BalanceChange:
+    account: str
+    block: int
+    protocol: str
+    adapter: str
+    token: str
+    old: Optional[AssetBalance]
+    new: Optional[AssetBalance]
+
+
+@dataclass(frozen=True)
+class ContractCall:
+    to: str
+    data: str
+    serializer: Callable[[str], Any]
 
 
 @dataclass(frozen=True)
@@ -14,3 +14,17 @@ class AmountType(Enum):
 class AdapterType(Enum):
     Asset = 1
     Debt = 2
+
+
+class BalanceFormat(Enum):
+    Decimal = 1
+    Raw = 2
+
+
+class NodeErrorType(Enum):
+    RateLimit = 1
+    Transport = 2
+    Timeout = 3
+    Execution = 4
+    Unknown = 5
+    Limit = 6
@@ -28,3 +28,35 @@ class EthereumNodeEmptyResponse(EthereumNodeResponseError):
 class EthereumNodeInvalidResponse(EthereumNodeResponseError):
     def __init__(self, node_answer):
         super().__init__('Invalid response', 503, node_answer)
+
+
+class MulticallCallFailed(EthereumNodeResponseError):
+    def __init__(self, call, return_data):
+        super().__init__('Call failed', 400, return_data)
+        self.call = call
+
+
+class EthereumNodeRateLimited(EthereumNodeResponseException):
+    pass
+
+
+class EthereumNodeExecutionReverted(EthereumNodeResponseException):
+    pass
+
+
+class EthereumNodeLimitExceeded(EthereumNodeResponseException):
+    pass
+
+
+class EthereumNodeServerError(EthereumNodeResponseException):
+    pass
+
+
+class EthereumNodeTimeout(EthereumNodeResponseError):
+    def __init__(self):
+        super().__init__('Timeout', 504, None)
+
+
+class EthereumNodeTransportError(EthereumNodeResponseError):
+    def __init__(self, message):
+        super().__init__(message, 502, None)
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from aiohttp import web
+
+from defisdk.limiters import TokenBucket
+from defisdk.repositories.base import load_records, request_key
+
+RATE_LIMIT_ERROR = {'code': -32005, 'message': 'rate limit exceeded'}
+INTERNAL_ERROR = {'code': -32603, 'message': 'internal error'}
+NOT_RECORDED_ERROR = {'code': -32000, 'message': 'no recorded response'}
+
+
+class FakeNode:
+    # a JSON-RPC stand-in that answers from recorded request/response pairs (see RecordingTransport)
+
+    def __init__(
+            self,
+            records: Union[str, Iterable[Dict[str, Any]]] = (),
+            block_number: Optional[int] = None,
+            latency_median: float = 0,
+            latency_sigma: float = 0,
+            error_rate: float = 0,
+            rate_limit: Optional[float] = None,
+            seed: Optional[int] = None
+    ):
+        records = load_records(records) if isinstance(records, str) else records
+        self._responses: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            self._responses[request_key(record['request'])] = record['response']
+            # calls recorded at one block also answer the same call at any other block
+            if record['request']['method'] == 'eth_call':
+                self._responses.setdefault(self._call_key(record['request']), record['response'])
+        self.block_number = block_number
+        self._latency_median = latency_median
+        self._latency_sigma = latency_sigma
+        self._error_rate = error_rate
+        self._rate_limit = TokenBucket(rate_limit) if rate_limit else None
+        self._random = random.Random(seed)
+        self.requests = 0
+
+    @staticmethod
+    def _call_key(request: Dict[str, Any]) -> str:
+        return request_key({'method': 'eth_call', 'params': request.get('params', [])[:1]})
+
+    def latency(self) -> float:
+        if self._latency_median <= 0:
+            return 0
+        return self._random.lognormvariate(math.log(self._latency_median), self._latency_sigma)
+
+    def answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.requests += 1
+        answer: Dict[str, Any] = {'jsonrpc': '2.0', 'id': request.get('id')}
+        if self._error_rate and self._random.random() < self._error_rate:
+            return {**answer, 'error': INTERNAL_ERROR}
+        if request.get('method') == 'eth_blockNumber' and self.block_number is not None:
+            return {**answer, 'result': hex(self.block_number)}
+        response = self._responses.get(request_key(request))
+        if response is None and request.get('method') == 'eth_call':
+            response = self._responses.get(self._call_key(request))
+        return {**answer, **(response if response is not None else {'error': NOT_RECORDED_ERROR})}
+
+    async def handle(self, http_request: web.Request) -> web.Response:
+        data = await http_request.json()
+        await asyncio.sleep(self.latency())
+        if self._rate_limit is not None and not self._rate_limit.try_acquire():
+            return web.json_response({'jsonrpc': '2.0', 'id': None, 'error': RATE_LIMIT_ERROR}, status=429)
+        if isinstance(data, list):
+            return web.json_response([self.answer(request) for request in data])
+        return web.json_response(self.answer(data))
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/', self.handle)
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8545) -> web.AppRunner:
+        runner = web.AppRunner(self.app())
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Serve recorded JSON-RPC responses as a local Ethereum node')
+    parser.add_argument('records', help='JSON lines file written by RecordingTransport')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8545)
+    parser.add_argument('--block-number', type=int)
+    parser.add_argument('--latency-median', type=float, default=0, help='seconds, log-normally distributed')
+    parser.add_argument('--latency-sigma', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--rate-limit', type=float, help='requests per second before answering 429')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(args)
+
+    node = FakeNode(
+        args.records,
+        block_number=args.block_number,
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    web.run_app(node.app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
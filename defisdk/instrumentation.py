@@ -0,0 +1,105 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('queue', 'network', 'parse', 'decode')
+
+
+@dataclass
+class CallMetrics:
+    method: str
+    function: Optional[str] = None
+    target: Optional[str] = None
+    block: Optional[str] = None
+    node: Optional[str] = None
+    attempts: int = 0
+    cached: bool = False
+    batched: bool = False
+    queue_seconds: float = 0
+    network_seconds: float = 0
+    parse_seconds: float = 0
+    decode_seconds: float = 0
+    response_bytes: int = 0
+    entities: Optional[int] = None
+    error: Optional[str] = None
+
+
+Hook = Callable[[CallMetrics], Any]
+
+
+def emit(hooks, metrics: CallMetrics):
+    for hook in hooks:
+        # a failing metrics backend must never fail the call it reports on
+        try:
+            hook(metrics)
+        except Exception:
+            logger.exception('DeFiSDK metrics hook failed')
+
+
+def node_label(node: Optional[str]) -> str:
+    # node urls often carry an API key in the path or query, only the host goes into labels
+    return urlsplit(node).netloc if node else ''
+
+
+def count_entities(result: Any) -> int:
+    return len(result) if isinstance(result, (list, tuple)) else 1
+
+
+class PrometheusHook:
+
+    def __init__(self, registry=None, namespace: str = 'defisdk'):
+        try:
+            from prometheus_client import REGISTRY, Counter, Histogram
+        except ImportError:
+            raise ImportError('prometheus_client is required for PrometheusHook, install defisdk[prometheus]')
+        registry = registry if registry is not None else REGISTRY
+        self._calls = Counter(
+            'calls', 'JSON-RPC calls', ('method', 'function', 'node', 'error'),
+            namespace=namespace, registry=registry
+        )
+        self._seconds = Histogram(
+            'call_stage_seconds', 'Time spent per call stage', ('function', 'stage'),
+            namespace=namespace, registry=registry
+        )
+        self._bytes = Histogram(
+            'response_bytes', 'Size of node responses', ('function',),
+            namespace=namespace, registry=registry,
+            buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+        )
+
+    def __call__(self, metrics: CallMetrics):
+        function = metrics.function or ''
+        self._calls.labels(metrics.method, function, node_label(metrics.node), metrics.error or '').inc()
+        for stage in STAGES:
+            self._seconds.labels(function, stage).observe(getattr(metrics, f'{stage}_seconds'))
+        if metrics.response_bytes:
+            self._bytes.labels(function).observe(metrics.response_bytes)
+
+
+class OpenTelemetryHook:
+
+    def __init__(self, meter=None):
+        try:
+            from opentelemetry import metrics as otel_metrics
+        except ImportError:
+            raise ImportError('opentelemetry-api is required for OpenTelemetryHook, install defisdk[opentelemetry]')
+        meter = meter if meter is not None else otel_metrics.get_meter('defisdk')
+        self._calls = meter.create_counter('defisdk.calls', description='JSON-RPC calls')
+        self._seconds = meter.create_histogram('defisdk.call.stage', unit='s', description='Time spent per call stage')
+        self._bytes = meter.create_histogram('defisdk.response.size', unit='By', description='Size of node responses')
+
+    def __call__(self, metrics: CallMetrics):
+        attributes = {
+            'rpc.method': metrics.method,
+            'defisdk.function': metrics.function or '',
+            'defisdk.node': node_label(metrics.node),
+            'error.type': metrics.error or ''
+        }
+        self._calls.add(1, attributes)
+        for stage in STAGES:
+            self._seconds.record(getattr(metrics, f'{stage}_seconds'), {**attributes, 'defisdk.stage': stage})
+        if metrics.response_bytes:
+            self._bytes.record(metrics.response_bytes, attributes)
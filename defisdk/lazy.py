@@ -0,0 +1,102 @@
+from dataclasses import fields
+from functools import partial
+from typing import Tuple
+
+from defisdk.decoder import (
+    AmountConverter,
+    read_adapter_metadata,
+    read_asset_balance,
+    read_int,
+    read_protocol_metadata,
+    read_tuple
+)
+from defisdk.entities import AdapterBalance, AdapterMetadata, AssetBalance, ProtocolBalance, ProtocolMetadata
+from defisdk.utils import int_to_decimal
+
+
+class LazyEntity:
+    # mixed into a subclass of an eager entity, the subclass replaces the entity fields with memoizing properties
+    __slots__ = ()
+    _entity: type
+
+    def __new__(cls, *args, **kwargs):
+        if args and isinstance(args[0], bytes):
+            return super().__new__(cls)
+        # dataclasses.replace builds a new instance from the entity fields, that one is the eager entity
+        return cls._entity(*args, **kwargs)
+
+    def __init__(self, data: bytes, offset: int, amount_converter: AmountConverter = int_to_decimal):
+        object.__setattr__(self, '_data', data)
+        object.__setattr__(self, '_offset', offset)
+        object.__setattr__(self, '_amount_converter', amount_converter)
+        for name in self.__slots__[3:]:
+            object.__setattr__(self, name, None)
+
+    def _memoize(self, name: str, value):
+        object.__setattr__(self, name, value)
+        return value
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, f.name) for f in fields(self._entity))
+
+    # eager entities only compare equal to their own class, so equality with them is implemented here
+    def __eq__(self, other):
+        if not isinstance(other, self._entity):
+            return NotImplemented
+        return self._values() == tuple(getattr(other, f.name) for f in fields(self._entity))
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __reduce__(self):
+        return self._entity, self._values()
+
+
+class LazyAdapterBalance(LazyEntity, AdapterBalance):
+    __slots__ = ('_data', '_offset', '_amount_converter', '_metadata', '_asset_balances')
+    _entity = AdapterBalance
+
+    @property
+    def metadata(self) -> AdapterMetadata:
+        if self._metadata is None:
+            return self._memoize(
+                '_metadata',
+                read_adapter_metadata(self._data, self._offset + read_int(self._data, self._offset))
+            )
+        return self._metadata
+
+    @property
+    def asset_balances(self) -> Tuple[AssetBalance, ...]:
+        if self._asset_balances is None:
+            return self._memoize('_asset_balances', read_tuple(
+                self._data,
+                self._offset + read_int(self._data, self._offset + 32),
+                partial(read_asset_balance, amount_converter=self._amount_converter),
+                dynamic_elements=True
+            ))
+        return self._asset_balances
+
+
+class LazyProtocolBalance(LazyEntity, ProtocolBalance):
+    __slots__ = ('_data', '_offset', '_amount_converter', '_metadata', '_adapter_balances')
+    _entity = ProtocolBalance
+
+    @property
+    def metadata(self) -> ProtocolMetadata:
+        if self._metadata is None:
+            return self._memoize(
+                '_metadata',
+                read_protocol_metadata(self._data, self._offset + read_int(self._data, self._offset))
+            )
+        return self._metadata
+
+    @property
+    def adapter_balances(self) -> Tuple[AdapterBalance, ...]:
+        if self._adapter_balances is None:
+            return self._memoize('_adapter_balances', read_tuple(
+                self._data,
+                self._offset + read_int(self._data, self._offset + 32),
+                partial(LazyAdapterBalance, amount_converter=self._amount_converter),
+                dynamic_elements=True
+            ))
+        return self._adapter_balances
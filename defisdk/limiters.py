@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from defisdk.enums import NodeErrorType
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # created on first use, on python < 3.10 a lock binds to the loop current at creation
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, cost: float = 1) -> bool:
+        self._refill()
+        if (self._lock is not None and self._lock.locked()) or self._tokens < cost:
+            return False
+        self._tokens -= cost
+        return True
+
+    def check_cost(self, cost: float):
+        # tokens never exceed the capacity, such a request would wait forever
+        if cost > self.capacity:
+            raise ValueError(f'Cost {cost} exceeds the token bucket capacity {self.capacity}')
+
+    async def acquire(self, cost: float = 1):
+        self.check_cost(cost)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # the lock queues waiters in order, so a large request is not starved by a stream of small ones
+        async with self._lock:
+            self._refill()
+            while self._tokens < cost:
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= cost
+
+
+class RateLimiter:
+
+    def __init__(
+            self,
+            requests_per_second: Optional[float] = None,
+            compute_units_per_second: Optional[float] = None,
+            method_costs: Optional[Dict[str, float]] = None,
+            default_cost: float = 1,
+            burst: float = 1
+    ):
+        self._requests = None
+        self._compute_units = None
+        if requests_per_second:
+            self._requests = TokenBucket(requests_per_second, requests_per_second * burst)
+        if compute_units_per_second:
+            self._compute_units = TokenBucket(compute_units_per_second, compute_units_per_second * burst)
+        self._method_costs = method_costs or {}
+        self._default_cost = default_cost
+        if self._requests is not None:
+            self._requests.check_cost(1)
+        if self._compute_units is not None:
+            for cost in (default_cost, *self._method_costs.values()):
+                self._compute_units.check_cost(cost)
+
+    async def acquire(self, method: str):
+        if self._requests is not None:
+            await self._requests.acquire()
+        if self._compute_units is not None:
+            await self._compute_units.acquire(self._method_costs.get(method, self._default_cost))
+
+
+class AdaptiveConcurrencyLimiter:
+
+    def __init__(
+            self,
+            initial: int = 16,
+            minimum: int = 1,
+            maximum: int = 256,
+            backoff: float = 0.5,
+            latency_tolerance: float = 2.0,
+            window: int = 100
+    ):
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._minimum = minimum
+        self._maximum = maximum
+        self._backoff = backoff
+        self._latency_tolerance = latency_tolerance
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._latency = 0.0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def min_latency(self) -> Optional[float]:
+        return min(self._latencies) if self._latencies else None
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just before cancellation
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: Optional[float] = None, error: Optional[NodeErrorType] = None):
+        self.in_flight -= 1
+        if error == NodeErrorType.RateLimit:
+            self._decrease()
+        elif latency is not None:
+            self._observe(latency)
+        self._wake()
+
+    def _observe(self, latency: float):
+        self._latencies.append(latency)
+        self._latency = latency if self._latency == 0 else self._latency + 0.2 * (latency - self._latency)
+        if self._latency > self.min_latency * self._latency_tolerance:
+            self._decrease()
+        else:
+            # additive increase: about one extra slot per limit-worth of healthy responses
+            self.limit = min(self._maximum, self.limit + 1 / self.limit)
+
+    def _decrease(self):
+        # one multiplicative decrease per round trip, however many in-flight requests report the same congestion
+        now = time.monotonic()
+        if now - self._last_decrease < (self._latency or 0):
+            return
+        self._last_decrease = now
+        self.limit = max(self._minimum, self.limit * self._backoff)
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
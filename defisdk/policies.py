@@ -0,0 +1,75 @@
+import asyncio
+import random
+from typing import Iterable, Optional
+
+import aiohttp
+
+from defisdk.enums import NodeErrorType
+from defisdk.errors import (
+    EthereumNodeExecutionReverted,
+    EthereumNodeLimitExceeded,
+    EthereumNodeNoResponse,
+    EthereumNodeRateLimited,
+    EthereumNodeServerError,
+    EthereumNodeTimeout,
+    EthereumNodeTransportError
+)
+
+
+RETRYABLE_ERRORS = (NodeErrorType.RateLimit, NodeErrorType.Transport, NodeErrorType.Timeout)
+# errors a smaller query may avoid: gas caps and the node's own response size and execution time limits.
+# Client-side timeouts and unclassified errors say nothing about the query size, splitting on them only multiplies
+# requests.
+SPLITTABLE_ERRORS = (NodeErrorType.Execution, NodeErrorType.Limit)
+
+
+def classify_error(error: Exception) -> NodeErrorType:
+    if isinstance(error, EthereumNodeRateLimited):
+        return NodeErrorType.RateLimit
+    if isinstance(error, aiohttp.ClientResponseError) and error.status == 429:
+        return NodeErrorType.RateLimit
+    if isinstance(error, EthereumNodeExecutionReverted):
+        return NodeErrorType.Execution
+    if isinstance(error, EthereumNodeLimitExceeded):
+        return NodeErrorType.Limit
+    if isinstance(error, (EthereumNodeTimeout, asyncio.TimeoutError)):
+        return NodeErrorType.Timeout
+    if isinstance(error, (EthereumNodeTransportError, EthereumNodeServerError, EthereumNodeNoResponse)):
+        return NodeErrorType.Transport
+    if isinstance(error, aiohttp.ClientError):
+        return NodeErrorType.Transport
+    return NodeErrorType.Unknown
+
+
+def is_splittable(error: Exception) -> bool:
+    return classify_error(error) in SPLITTABLE_ERRORS
+
+
+class RetryPolicy:
+
+    def __init__(
+            self,
+            timeout: Optional[float] = 30,
+            deadline: Optional[float] = None,
+            retries: int = 2,
+            backoff_base: float = 0.1,
+            backoff_max: float = 5,
+            jitter: bool = True,
+            retry_on: Iterable[NodeErrorType] = RETRYABLE_ERRORS
+    ):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_on = frozenset(retry_on)
+
+    def is_retryable(self, error: Exception) -> bool:
+        return classify_error(error) in self.retry_on
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        # full jitter keeps clients that failed together from retrying together
+        return random.uniform(0, delay) if self.jitter else delay
+
@@ -1,18 +1,178 @@
+import asyncio
+import json
+import time
+
 import aiohttp
 
-from typing import Any, Dict
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Union
 from furl import furl
 
+from defisdk.settings import (
+    HTTP_CONNECTION_LIMIT, HTTP_CONNECTION_LIMIT_PER_HOST, HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT
+)
+
+Post = Callable[[str, Dict[str, str], Any], Awaitable[Any]]
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    # request ids differ between runs, so requests are matched by method and params only
+    return json.dumps([request['method'], request.get('params', [])], sort_keys=True, separators=(',', ':'))
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class BaseTransport:
+
+    async def post(self, send: Post, url: str, headers: Dict[str, str], data: Any) -> Any:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RecordingTransport(BaseTransport):
+    # every request/answer pair becomes one JSON line: {"request": {...}, "response": {...}}
+
+    def __init__(self, path: str):
+        self._file = open(path, 'a')
+
+    async def post(self, send: Post, url: str, headers: Dict[str, str], data: Any) -> Any:
+        answer = await send(url, headers, data)
+        requests = data if isinstance(data, list) else [data]
+        answers = answer if isinstance(answer, list) else [answer]
+        answers_by_id = {item.get('id'): item for item in answers if isinstance(item, dict)}
+        for request in requests:
+            response = answers_by_id.get(request.get('id'))
+            if response is None:
+                continue
+            record = {
+                'request': {'method': request['method'], 'params': request.get('params', [])},
+                'response': {key: value for key, value in response.items() if key in ('result', 'error')}
+            }
+            self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+        return answer
+
+    def close(self):
+        self._file.close()
+
+
+class ReplayTransport(BaseTransport):
+    # repeated requests get their recorded answers in order, the last one is repeated once they run out
+
+    def __init__(self, records: Union[str, Iterable[Dict[str, Any]]]):
+        records = load_records(records) if isinstance(records, str) else records
+        self._responses: Dict[str, Deque[Dict[str, Any]]] = {}
+        for record in records:
+            self._responses.setdefault(request_key(record['request']), deque()).append(record['response'])
+
+    async def post(self, send: Post, url: str, headers: Dict[str, str], data: Any) -> Any:
+        if isinstance(data, list):
+            return [self._answer(request) for request in data]
+        return self._answer(data)
+
+    def _answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        responses = self._responses.get(request_key(request))
+        if not responses:
+            raise LookupError(f'No recorded response for {request_key(request)}')
+        response = responses.popleft() if len(responses) > 1 else responses[0]
+        return {'jsonrpc': '2.0', 'id': request.get('id'), **response}
+
 
 class BaseAPIRepository:
     _url: furl
 
+    def __init__(
+            self,
+            session: Optional[aiohttp.ClientSession] = None,
+            connector: Optional[aiohttp.BaseConnector] = None,
+            connection_limit: int = HTTP_CONNECTION_LIMIT,
+            connection_limit_per_host: int = HTTP_CONNECTION_LIMIT_PER_HOST,
+            dns_cache_ttl: int = HTTP_DNS_CACHE_TTL,
+            keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+            transport: Optional[BaseTransport] = None
+    ):
+        self._session = session
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connector = connector
+        # injected sessions and connectors belong to the caller and are never closed here
+        self._owns_session = session is None
+        self._connection_limit = connection_limit
+        self._connection_limit_per_host = connection_limit_per_host
+        self._dns_cache_ttl = dns_cache_ttl
+        self._keepalive_timeout = keepalive_timeout
+        self._transport = transport
+
     @property
     def url(self):
         return self._url.copy()
 
-    @staticmethod
-    async def _post(url: str, headers: Dict[str, str], data: Dict[str, Any]) -> Dict[str, Any]:
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.post(url, json=data) as r:
-                return await r.json()
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # an owned session and its connector are bound to the loop they were created on, a later asyncio.run
+        # gets new ones
+        if self._owns_session and self._session is not None and self._session_loop is not loop:
+            self._session = None
+        if self._session is None or self._session.closed:
+            if not self._owns_session:
+                raise RuntimeError('Injected aiohttp session is closed')
+            self._session = self._create_session()
+            self._session_loop = loop
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        if self._connector is not None:
+            return aiohttp.ClientSession(connector=self._connector, connector_owner=False)
+        connector = aiohttp.TCPConnector(
+            limit=self._connection_limit,
+            limit_per_host=self._connection_limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self._dns_cache_ttl,
+            keepalive_timeout=self._keepalive_timeout
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    async def _post(
+            self,
+            url: str,
+            headers: Dict[str, str],
+            data: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if self._transport is not None:
+            return await self._transport.post(self._post_http, url, headers, data)
+        return await self._post_http(url, headers, data)
+
+    async def _post_http(
+            self,
+            url: str,
+            headers: Dict[str, str],
+            data: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        async with self.session.post(url, headers=headers, json=data) as r:
+            body = await r.read()
+            start = time.perf_counter()
+            answer = await r.json()
+        self._on_response(len(body), time.perf_counter() - start)
+        return answer
+
+    def _on_response(self, response_bytes: int, parse_seconds: float):
+        pass
+
+    async def aclose(self):
+        if not self._owns_session:
+            return
+        # a session of a finished loop cannot be closed from this one any more
+        if self._session is not None and not self._session.closed and self._session_loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
@@ -1,45 +1,493 @@
-from typing import List, Union
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Sequence, Tuple, Union
 
 from furl import furl
 
-from defisdk.entities import AdapterBalance, ProtocolBalance, TokenBalance, TokenMetadata, AssetBalance
+from defisdk.abi import FunctionEncoder
+from defisdk.cache import BaseCache
+from defisdk.columnar import PortfolioColumns
+from defisdk.concurrency import bounded_map
+from defisdk.entities import (
+    AdapterBalance,
+    AssetBalance,
+    ContractCall,
+    ProtocolBalance,
+    ProtocolMetadata,
+    RawBalance,
+    RegistrySnapshot,
+    TokenBalance,
+    TokenMetadata
+)
+from defisdk.enums import BalanceFormat
+from defisdk.errors import EthereumNodeEmptyResponse, MulticallCallFailed
+from defisdk.policies import is_splittable
 from defisdk.repositories.ethereum import BaseEthereumRepository
+from defisdk.repositories.nodes import NodeEndpoint, NodePool
 from defisdk.serializers import (
     defi_sdk_adapter_balances_to_entity,
+    defi_sdk_first_adapter_balance_to_entity,
+    defi_sdk_first_protocol_balance_to_entity,
+    defi_sdk_protocol_adapters_to_list_of_string,
     defi_sdk_protocol_balances_to_entity,
     defi_sdk_protocol_names_to_list_of_string,
     defi_sdk_token_adapter_names_to_list_of_string,
-    defi_sdk_full_token_balance_to_entity
+    defi_sdk_full_token_balance_to_entity,
+    multicall_results_to_list
+)
+from defisdk.settings import (
+    ACTIVE_ADAPTERS_ACCOUNTS,
+    BALANCES_CHUNK_SIZE,
+    BALANCES_SPLIT_ACCOUNTS,
+    BULK_CONCURRENCY,
+    MULTICALL_ADDRESS,
+    MULTICALL_SIZE,
+    REGISTRY_RETRY_BACKOFF,
+    WATCHER_POLL_INTERVAL
 )
-from defisdk.utils import get_signature_hash, hash_to_address, hash_to_list, remove_0x_prefix, string_to_hash
+from defisdk.utils import hash_to_address, int_to_decimal
+from defisdk.watcher import BalanceWatcher
+
+GET_BALANCES = FunctionEncoder('getBalances(address)')
+GET_ADAPTER_BALANCES = FunctionEncoder('getAdapterBalances(address,address[])')
+GET_PROTOCOL_BALANCES = FunctionEncoder('getProtocolBalances(address,string[])')
+GET_PROTOCOL_NAMES = FunctionEncoder('getProtocolNames()')
+GET_TOKEN_ADAPTER_NAMES = FunctionEncoder('getTokenAdapterNames()')
+GET_PROTOCOL_ADAPTERS = FunctionEncoder('getProtocolAdapters(string)')
+GET_TOKEN_ADAPTER = FunctionEncoder('getTokenAdapter(string)')
+GET_FULL_TOKEN_BALANCE = FunctionEncoder('getFullTokenBalance(string,address)')
+GET_FINAL_FULL_TOKEN_BALANCE = FunctionEncoder('getFinalFullTokenBalance(string,address)')
+TRY_AGGREGATE = FunctionEncoder('tryAggregate(bool,(address,bytes)[])')
+
+ActiveAdapters = Tuple[Tuple[ProtocolMetadata, Tuple[str, ...]], ...]
 
 
 class DeFiSDKAPIRepository(BaseEthereumRepository):
+    # multicall results are only split here, their return data is decoded (and offloaded) per call
+    _inline_serializers = BaseEthereumRepository._inline_serializers | {multicall_results_to_list}
 
-    def __init__(self, ethereum_node_url: str, defisdk_registry: str):
-        self._get_user_balance = get_signature_hash(b"getBalances(address)")
-        self._get_adapter_balances = get_signature_hash(b"getAdapterBalances(address,address[])")
-        self._get_protocol_balances = get_signature_hash(b"getProtocolBalances(address,string[])")
-        self._get_protocol_names = get_signature_hash(b"getProtocolNames()")
-        self._get_token_adapter_names = get_signature_hash(b"getTokenAdapterNames()")
-        self._get_protocol_adapters = get_signature_hash(b"getProtocolAdapters(string)")
-        self._get_token_adapter = get_signature_hash(b"getTokenAdapter(string)")
-        self._get_full_token_balance = get_signature_hash(b"getFullTokenBalance(string,address)")
-        self._get_final_full_token_balance = get_signature_hash(b"getFinalFullTokenBalance(string,address)")
-        self._url = furl(ethereum_node_url)
+    def __init__(
+            self,
+            ethereum_node_url: Union[str, Sequence[Union[str, NodeEndpoint]]],
+            defisdk_registry: str,
+            hedge_percentile: Optional[float] = None,
+            multicall: str = MULTICALL_ADDRESS,
+            multicall_size: int = MULTICALL_SIZE,
+            registry_cache_ttl: Optional[float] = None,
+            balance_format: BalanceFormat = BalanceFormat.Decimal,
+            balances_chunk_size: int = BALANCES_CHUNK_SIZE,
+            split_balances: bool = False,
+            active_adapters_rescan_interval: Optional[float] = None,
+            lazy_balances: bool = False,
+            **kwargs
+    ):
+        endpoints = [ethereum_node_url] if isinstance(ethereum_node_url, str) else ethereum_node_url
+        self._nodes = NodePool(endpoints, hedge_percentile=hedge_percentile)
+        self._url = furl(self._nodes.endpoints[0].url)
         self._registry = defisdk_registry
-        super().__init__()
+        self._multicall = multicall
+        self._multicall_size = multicall_size
+        self._registry_cache_ttl = registry_cache_ttl
+        self._balances_chunk_size = balances_chunk_size
+        self._split_balances = split_balances
+        self._account_chunk_sizes: 'OrderedDict[str, int]' = OrderedDict()
+        self._active_adapters_rescan_interval = active_adapters_rescan_interval
+        # account -> (time of the next full rescan, adapters with positions grouped by protocol)
+        self._active_adapters: 'OrderedDict[str, Tuple[float, ActiveAdapters]]' = OrderedDict()
+        self._registry_snapshot: Optional[RegistrySnapshot] = None
+        self._registry_snapshot_expires_at = 0.0
+        self._registry_refresh: Optional[asyncio.Future] = None
+        self._registry_failures = 0
+        self._registry_retry_at = 0.0
+        amount_converter = RawBalance if balance_format == BalanceFormat.Raw else int_to_decimal
+        self._protocol_balances_serializer = partial(
+            defi_sdk_protocol_balances_to_entity, amount_converter=amount_converter, lazy=lazy_balances
+        )
+        self._adapter_balances_serializer = partial(
+            defi_sdk_adapter_balances_to_entity, amount_converter=amount_converter, lazy=lazy_balances
+        )
+        self._first_protocol_balance_serializer = partial(
+            defi_sdk_first_protocol_balance_to_entity, amount_converter=amount_converter, lazy=lazy_balances
+        )
+        self._first_adapter_balance_serializer = partial(
+            defi_sdk_first_adapter_balance_to_entity, amount_converter=amount_converter, lazy=lazy_balances
+        )
+        self._full_token_balance_serializer = partial(
+            defi_sdk_full_token_balance_to_entity, amount_converter=amount_converter
+        )
+        super().__init__(**kwargs)
+
+    async def _execute(self, call: ContractCall, block: Union[str, int] = 'latest') -> Any:
+        return await self._call(call.to, call.data, serializer=call.serializer, block=block)
+
+    async def aggregate(self, calls: List[ContractCall], block: Union[str, int] = 'latest') -> List[Any]:
+        chunks = [calls[i:i + self._multicall_size] for i in range(0, len(calls), self._multicall_size)]
+        results = await asyncio.gather(*[self._aggregate_chunk(chunk, block) for chunk in chunks])
+        return list(itertools.chain.from_iterable(results))
+
+    async def _aggregate_chunk(self, calls: List[ContractCall], block: Union[str, int]) -> List[Any]:
+        try:
+            results = await self._call(
+                self._multicall,
+                TRY_AGGREGATE(False, [(call.to, call.data) for call in calls]),
+                serializer=multicall_results_to_list,
+                block=block
+            )
+        except Exception as e:
+            return [e] * len(calls)
+        if self._decode_executor is None:
+            return [
+                self._multicall_result(call, success, return_data)
+                for call, (success, return_data) in zip(calls, results)
+            ]
+        return list(await asyncio.gather(*[
+            self._decode_multicall_result(call, success, return_data)
+            for call, (success, return_data) in zip(calls, results)
+        ]))
+
+    @staticmethod
+    def _multicall_result(call: ContractCall, success: bool, return_data: str) -> Any:
+        if not success:
+            return MulticallCallFailed(call, return_data)
+        if return_data == '0x':
+            return EthereumNodeEmptyResponse()
+        try:
+            return call.serializer(return_data)
+        except Exception as e:
+            return e
+
+    async def _decode_multicall_result(self, call: ContractCall, success: bool, return_data: str) -> Any:
+        if not success or not self._offloads(call.serializer, return_data):
+            return self._multicall_result(call, success, return_data)
+        try:
+            return await self._decode(call.serializer, return_data)
+        except Exception as e:
+            return e
+
+    async def warm_registry(self) -> RegistrySnapshot:
+        # the block number and the name lists share one JSON-RPC batch, the per-name lookups one multicall.
+        # The batch goes out once both requests are queued, the window only matters when one never reaches the node.
+        async with self.batch(window=0.05, max_size=2):
+            block, (protocol_names, token_adapter_names) = await asyncio.gather(
+                self.get_block_number(),
+                self.aggregate([self.protocol_names_call(), self.token_adapter_names_call()], 'latest')
+            )
+        for names in (protocol_names, token_adapter_names):
+            if isinstance(names, Exception):
+                raise names
+
+        results = await self.aggregate(
+            [self.protocol_adapter_names_call(name) for name in protocol_names] +
+            [self.token_adapter_call(name) for name in token_adapter_names],
+            block
+        )
+        protocol_adapter_names = dict(zip(protocol_names, results[:len(protocol_names)]))
+        token_adapters = dict(zip(token_adapter_names, results[len(protocol_names):]))
+        snapshot = RegistrySnapshot(
+            block=block,
+            protocol_names=protocol_names,
+            token_adapter_names=token_adapter_names,
+            # names whose lookup failed are left out and served by the node
+            protocol_adapter_names={k: v for k, v in protocol_adapter_names.items() if not isinstance(v, Exception)},
+            token_adapters={k: v for k, v in token_adapters.items() if not isinstance(v, Exception)}
+        )
+        self._registry_snapshot = snapshot
+        self._registry_snapshot_expires_at = time.monotonic() + (self._registry_cache_ttl or 0)
+        return snapshot
+
+    def invalidate_registry(self):
+        self._registry_snapshot = None
+        self._registry_snapshot_expires_at = 0.0
+
+    async def _get_registry_snapshot(self, block: Union[str, int]) -> Optional[RegistrySnapshot]:
+        if self._registry_cache_ttl is None:
+            return None
+        if self._registry_snapshot is None or self._registry_snapshot_expires_at <= time.monotonic():
+            if self._registry_refresh is None and self._registry_retry_at > time.monotonic():
+                # the last warm failed, lookups go to the node until the backoff is over
+                return None
+            if self._registry_refresh is None:
+                self._registry_refresh = asyncio.ensure_future(self.warm_registry())
+                self._registry_refresh.add_done_callback(self._registry_refresh_done)
+            try:
+                await asyncio.shield(self._registry_refresh)
+            except Exception:
+                return None
+        snapshot = self._registry_snapshot
+        # the registry may have been different before the snapshot was taken
+        if snapshot is None or isinstance(block, int) and block < snapshot.block:
+            return None
+        return snapshot
+
+    def _registry_refresh_done(self, future: asyncio.Future):
+        self._registry_refresh = None
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            self._registry_failures = 0
+            return
+        # e.g. no Multicall2 on the chain: back off instead of re-warming on every lookup
+        self._registry_failures += 1
+        backoff = min(REGISTRY_RETRY_BACKOFF * 2 ** (self._registry_failures - 1), max(self._registry_cache_ttl, 1))
+        self._registry_retry_at = time.monotonic() + backoff
+
+    def account_balance_call(self, address: str) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_BALANCES(address),
+            self._protocol_balances_serializer
+        )
+
+    def adapter_balance_call(self, address: str, adapter: str) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_ADAPTER_BALANCES(address, [adapter]),
+            self._first_adapter_balance_serializer
+        )
+
+    def protocol_balance_call(self, address: str, protocol_name: str) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_PROTOCOL_BALANCES(address, [protocol_name]),
+            self._first_protocol_balance_serializer
+        )
+
+    def adapter_balances_call(self, address: str, adapters: Sequence[str]) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_ADAPTER_BALANCES(address, list(adapters)),
+            self._adapter_balances_serializer
+        )
+
+    def protocol_balances_call(self, address: str, protocol_names: Sequence[str]) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_PROTOCOL_BALANCES(address, list(protocol_names)),
+            self._protocol_balances_serializer
+        )
+
+    def protocol_names_call(self) -> ContractCall:
+        return ContractCall(self._registry, GET_PROTOCOL_NAMES(), defi_sdk_protocol_names_to_list_of_string)
+
+    def token_adapter_names_call(self) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_TOKEN_ADAPTER_NAMES(),
+            defi_sdk_token_adapter_names_to_list_of_string
+        )
+
+    def protocol_adapter_names_call(self, protocol_name: str) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_PROTOCOL_ADAPTERS(protocol_name),
+            defi_sdk_protocol_adapters_to_list_of_string
+        )
+
+    def token_adapter_call(self, token_adapter_name: str) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_TOKEN_ADAPTER(token_adapter_name),
+            hash_to_address
+        )
+
+    def full_token_balance_call(self, token_type: str, token_address: str) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_FULL_TOKEN_BALANCE(token_type, token_address),
+            self._full_token_balance_serializer
+        )
+
+    def final_full_token_balance_call(self, token_type: str, token_address: str) -> ContractCall:
+        return ContractCall(
+            self._registry,
+            GET_FINAL_FULL_TOKEN_BALANCE(token_type, token_address),
+            self._full_token_balance_serializer
+        )
 
     async def get_account_balance(
             self,
             address: str,
             block: Union[str, int] = 'latest'
     ) -> List[ProtocolBalance]:
-        return await self._call(
-            self._registry,
-            self._get_user_balance + remove_0x_prefix(address).zfill(64),
-            serializer=defi_sdk_protocol_balances_to_entity,
-            block=block
+        indexed = self._active_adapters_rescan_interval is not None and block == 'latest'
+        if indexed:
+            active = self._active_adapters.get(address.lower())
+            if active is not None and active[0] > time.monotonic():
+                return await self._get_active_account_balance(address, active[1], block)
+        balances = await self._get_full_account_balance(address, block)
+        if indexed:
+            self._index_active_adapters(address, balances)
+        return balances
+
+    async def _get_full_account_balance(
+            self,
+            address: str,
+            block: Union[str, int]
+    ) -> List[ProtocolBalance]:
+        if not self._split_balances:
+            return await self._execute(self.account_balance_call(address), block)
+        chunk_size = self._account_chunk_sizes.get(address.lower())
+        if chunk_size is None:
+            try:
+                return await self._execute(self.account_balance_call(address), block)
+            except Exception as e:
+                if not is_splittable(e):
+                    raise
+            chunk_size = self._balances_chunk_size
+        return await self._get_account_balance_split(address, chunk_size, block)
+
+    async def _get_active_account_balance(
+            self,
+            address: str,
+            active: ActiveAdapters,
+            block: Union[str, int]
+    ) -> List[ProtocolBalance]:
+        adapters = [adapter for _, protocol_adapters in active for adapter in protocol_adapters]
+        adapter_balances = {
+            adapter_balance.metadata.address.lower(): adapter_balance
+            for adapter_balance in await self.get_adapter_balances(address, adapters, block)
+            if adapter_balance.asset_balances
+        }
+        balances = []
+        for metadata, protocol_adapters in active:
+            protocol_adapter_balances = tuple(
+                adapter_balances[adapter] for adapter in protocol_adapters if adapter in adapter_balances
+            )
+            if protocol_adapter_balances:
+                balances.append(ProtocolBalance(metadata, protocol_adapter_balances))
+        return balances
+
+    def _index_active_adapters(self, address: str, balances: List[ProtocolBalance]):
+        active = tuple(
+            (balance.metadata, tuple(
+                adapter.metadata.address.lower() for adapter in balance.adapter_balances if adapter.asset_balances
+            ))
+            for balance in balances
+        )
+        self._active_adapters[address.lower()] = (time.monotonic() + self._active_adapters_rescan_interval, active)
+        self._active_adapters.move_to_end(address.lower())
+        while len(self._active_adapters) > ACTIVE_ADAPTERS_ACCOUNTS:
+            self._active_adapters.popitem(last=False)
+
+    def invalidate_active_adapters(self, address: Optional[str] = None):
+        if address is None:
+            self._active_adapters.clear()
+        else:
+            self._active_adapters.pop(address.lower(), None)
+
+    async def _get_account_balance_split(
+            self,
+            address: str,
+            chunk_size: int,
+            block: Union[str, int]
+    ) -> List[ProtocolBalance]:
+        # the protocol names and every chunk must come from the same block
+        if block == 'latest':
+            block = await self.get_block_number()
+        protocol_names = await self.get_protocol_names(block)
+        outcomes: List[Tuple[int, bool]] = []
+        balances = await self._chunked_call(
+            partial(self.protocol_balances_call, address), protocol_names, block, chunk_size, outcomes
+        )
+        # the next query for this account starts with the largest chunk that went through below any that failed
+        failed = min((size for size, success in outcomes if not success), default=None)
+        self._account_chunk_sizes[address.lower()] = max(
+            (size for size, success in outcomes if success and (failed is None or size < failed)),
+            default=chunk_size
+        )
+        self._account_chunk_sizes.move_to_end(address.lower())
+        while len(self._account_chunk_sizes) > BALANCES_SPLIT_ACCOUNTS:
+            self._account_chunk_sizes.popitem(last=False)
+        # getBalances leaves out protocols the account has no balances in
+        return [balance for balance in balances if any(adapter.asset_balances for adapter in balance.adapter_balances)]
+
+    def get_account_balances(
+            self,
+            addresses: Iterable[str],
+            block: Union[str, int] = 'latest',
+            concurrency: int = BULK_CONCURRENCY,
+            ordered: bool = False,
+            return_exceptions: bool = True
+    ) -> AsyncIterator[Tuple[str, Union[List[ProtocolBalance], Exception]]]:
+        return bounded_map(
+            lambda address: self.get_account_balance(address, block),
+            addresses,
+            concurrency,
+            ordered=ordered,
+            return_exceptions=return_exceptions
+        )
+
+    async def scan_account_balances(
+            self,
+            address: str,
+            start_block: int,
+            end_block: int,
+            step: int = 1,
+            concurrency: int = BULK_CONCURRENCY,
+            checkpoint: Optional[BaseCache] = None,
+            return_exceptions: bool = True
+    ) -> AsyncIterator[Tuple[int, Union[List[ProtocolBalance], Exception]]]:
+        key = f'scan:{address.lower()}:{start_block}:{end_block}:{step}'
+        last_block = checkpoint.get(key) if checkpoint is not None else None
+        first_block = int(last_block) + step if last_block is not None else start_block
+        failed = False
+        try:
+            async for block, balances in bounded_map(
+                    lambda block: self.get_account_balance(address, block),
+                    range(first_block, end_block + 1, step),
+                    concurrency,
+                    ordered=True,
+                    return_exceptions=return_exceptions
+            ):
+                yield block, balances
+                # the checkpoint moves once the consumer asks for the next block and stops at the first failure,
+                # so a resumed scan may repeat the last yielded block but never skips one
+                failed = failed or isinstance(balances, Exception)
+                if checkpoint is not None and not failed:
+                    checkpoint.set(key, str(block))
+        finally:
+            if checkpoint is not None:
+                checkpoint.flush()
+
+    async def get_account_balances_columns(
+            self,
+            addresses: Iterable[str],
+            block: Union[str, int] = 'latest',
+            concurrency: int = BULK_CONCURRENCY,
+            columns: Optional[PortfolioColumns] = None
+    ) -> PortfolioColumns:
+        columns = columns if columns is not None else PortfolioColumns()
+        # pin every account to the same block so the rows form one consistent snapshot
+        if block == 'latest':
+            block = await self.get_block_number()
+        responses = bounded_map(
+            lambda address: self._call(self._registry, self.account_balance_call(address).data, block=block),
+            addresses,
+            concurrency
+        )
+        async for address, response in responses:
+            if isinstance(response, Exception):
+                columns.errors[address] = response
+            else:
+                columns.extend_from_response(address, response, block if isinstance(block, int) else None)
+        return columns
+
+    def watch_account_balances(
+            self,
+            addresses: Iterable[str],
+            poll_interval: float = WATCHER_POLL_INTERVAL,
+            concurrency: int = BULK_CONCURRENCY
+    ) -> BalanceWatcher:
+        return BalanceWatcher(
+            self.get_block_number,
+            lambda address, block: self._call(self._registry, self.account_balance_call(address).data, block=block),
+            partial(self._decode, self._protocol_balances_serializer),
+            addresses,
+            poll_interval,
+            concurrency
         )
 
     async def get_adapter_balance(
@@ -48,19 +496,7 @@ class DeFiSDKAPIRepository(BaseEthereumRepository):
             adapter: str,
             block: Union[str, int] = 'latest'
     ) -> AdapterBalance:
-        words = [
-            remove_0x_prefix(address).zfill(64),  # first argument: address
-            remove_0x_prefix(hex(64)).zfill(64),  # position of the dynamic argument: [adapter]
-            remove_0x_prefix(hex(1)).zfill(64),  # length of the dynamic argument: [adapter]
-            remove_0x_prefix(adapter).zfill(64)  # second argument: [adapter]
-        ]
-        result = await self._call(
-            self._registry,
-            self._get_adapter_balances + ''.join(words),
-            serializer=defi_sdk_adapter_balances_to_entity,
-            block=block
-        )
-        return result[0]
+        return await self._execute(self.adapter_balance_call(address, adapter), block)
 
     async def get_protocol_balance(
             self,
@@ -68,77 +504,104 @@ class DeFiSDKAPIRepository(BaseEthereumRepository):
             protocol_name: str,
             block: Union[str, int] = 'latest'
     ) -> ProtocolBalance:
-        words = [
-            remove_0x_prefix(address).zfill(64),  # first argument: address
-            remove_0x_prefix(hex(64)).zfill(64),  # position of the dynamic argument: [protocol[]]
-            remove_0x_prefix(hex(1)).zfill(64),  # length of the dynamic argument: [protocol[]]
-            remove_0x_prefix(hex(32)).zfill(64),  # position of the dynamic argument: [protocol]
-            remove_0x_prefix(hex(len(protocol_name))).zfill(64),  # length of the dynamic argument: [protocol]
-            remove_0x_prefix(string_to_hash(protocol_name)).ljust(64, '0')  # left-aligned argument
-        ]
-        result = await self._call(
-            self._registry,
-            self._get_protocol_balances + ''.join(words),
-            serializer=defi_sdk_protocol_balances_to_entity,
-            block=block
+        return await self._execute(self.protocol_balance_call(address, protocol_name), block)
+
+    async def get_adapter_balances(
+            self,
+            address: str,
+            adapters: Sequence[str],
+            block: Union[str, int] = 'latest'
+    ) -> List[AdapterBalance]:
+        return await self._chunked_call(partial(self.adapter_balances_call, address), list(adapters), block)
+
+    async def get_protocol_balances(
+            self,
+            address: str,
+            protocol_names: Sequence[str],
+            block: Union[str, int] = 'latest'
+    ) -> List[ProtocolBalance]:
+        return await self._chunked_call(partial(self.protocol_balances_call, address), list(protocol_names), block)
+
+    async def _chunked_call(
+            self,
+            build: Callable[[List[str]], ContractCall],
+            items: List[str],
+            block: Union[str, int],
+            size: Optional[int] = None,
+            outcomes: Optional[List[Tuple[int, bool]]] = None
+    ) -> List[Any]:
+        size = size or self._balances_chunk_size
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        # chunks resolving 'latest' separately may land on different blocks of different nodes
+        if block == 'latest' and len(chunks) > 1:
+            block = await self.get_block_number()
+        results = await asyncio.gather(*[self._split_call(build, chunk, block, outcomes) for chunk in chunks])
+        return list(itertools.chain.from_iterable(results))
+
+    async def _split_call(
+            self,
+            build: Callable[[List[str]], ContractCall],
+            items: List[str],
+            block: Union[str, int],
+            outcomes: Optional[List[Tuple[int, bool]]] = None
+    ) -> List[Any]:
+        try:
+            result = await self._execute(build(items), block)
+            if outcomes is not None:
+                outcomes.append((len(items), True))
+            return result
+        except Exception as e:
+            # a query over too many protocols or adapters may hit the node's gas or response limits
+            if len(items) == 1 or not is_splittable(e):
+                raise
+            if outcomes is not None:
+                outcomes.append((len(items), False))
+        if block == 'latest':
+            block = await self.get_block_number()
+        middle = len(items) // 2
+        head, tail = await asyncio.gather(
+            self._split_call(build, items[:middle], block, outcomes),
+            self._split_call(build, items[middle:], block, outcomes)
         )
-        return result[0]
+        return head + tail
 
     async def get_protocol_names(
             self,
             block: Union[str, int] = 'latest'
     ) -> List[str]:
-        return await self._call(
-            self._registry,
-            self._get_protocol_names,
-            serializer=defi_sdk_protocol_names_to_list_of_string,
-            block=block
-        )
+        snapshot = await self._get_registry_snapshot(block)
+        if snapshot is not None:
+            return list(snapshot.protocol_names)
+        return await self._execute(self.protocol_names_call(), block)
 
     async def get_token_adapter_names(
             self,
             block: Union[str, int] = 'latest'
     ) -> List[str]:
-        return await self._call(
-            self._registry,
-            self._get_token_adapter_names,
-            serializer=defi_sdk_token_adapter_names_to_list_of_string,
-            block=block
-        )
+        snapshot = await self._get_registry_snapshot(block)
+        if snapshot is not None:
+            return list(snapshot.token_adapter_names)
+        return await self._execute(self.token_adapter_names_call(), block)
 
     async def get_protocol_adapter_names(
             self,
             protocol_name: str,
             block: Union[str, int] = 'latest'
     ) -> List[str]:
-        words = [
-            remove_0x_prefix(hex(32)).zfill(64),  # position of the dynamic argument
-            remove_0x_prefix(hex(len(protocol_name))).zfill(64),  # length of the dynamic argument
-            remove_0x_prefix(string_to_hash(protocol_name)).ljust(64, '0')  # left-aligned argument
-        ]
-        return await self._call(
-            self._registry,
-            self._get_protocol_adapters + ''.join(words),
-            serializer=hash_to_list,
-            block=block
-        )
+        snapshot = await self._get_registry_snapshot(block)
+        if snapshot is not None and protocol_name in snapshot.protocol_adapter_names:
+            return list(snapshot.protocol_adapter_names[protocol_name])
+        return await self._execute(self.protocol_adapter_names_call(protocol_name), block)
 
     async def get_token_adapter(
             self,
             token_adapter_name: str,
             block: Union[str, int] = 'latest'
     ) -> str:
-        words = [
-            remove_0x_prefix(hex(32)).zfill(64),  # position of the dynamic argument
-            remove_0x_prefix(hex(len(token_adapter_name))).zfill(64),  # length of the dynamic argument
-            remove_0x_prefix(string_to_hash(token_adapter_name)).ljust(64, '0')  # left-aligned argument
-        ]
-        return await self._call(
-            self._registry,
-            self._get_token_adapter + ''.join(words),
-            serializer=hash_to_address,
-            block=block
-        )
+        snapshot = await self._get_registry_snapshot(block)
+        if snapshot is not None and token_adapter_name in snapshot.token_adapters:
+            return snapshot.token_adapters[token_adapter_name]
+        return await self._execute(self.token_adapter_call(token_adapter_name), block)
 
     async def get_full_token_balance(
             self,
@@ -146,18 +609,7 @@ class DeFiSDKAPIRepository(BaseEthereumRepository):
             token_address: str,
             block: Union[str, int] = 'latest'
     ) -> AssetBalance:
-        words = [
-            remove_0x_prefix(hex(64)).zfill(64),  # position of the dynamic argument
-            remove_0x_prefix(token_address).zfill(64),  # second argument: address
-            remove_0x_prefix(hex(len(bytes(token_type, 'utf-8')))).zfill(64),  # length of the dynamic argument
-            remove_0x_prefix(string_to_hash(token_type)).ljust(64, '0')  # left-aligned argument
-        ]
-        return await self._call(
-            self._registry,
-            self._get_full_token_balance + ''.join(words),
-            serializer=defi_sdk_full_token_balance_to_entity,
-            block=block
-        )
+        return await self._execute(self.full_token_balance_call(token_type, token_address), block)
 
     async def get_final_full_token_balance(
             self,
@@ -165,18 +617,7 @@ class DeFiSDKAPIRepository(BaseEthereumRepository):
             token_address: str,
             block: Union[str, int] = 'latest'
     ) -> AssetBalance:
-        words = [
-            remove_0x_prefix(hex(64)).zfill(64),  # position of the dynamic argument
-            remove_0x_prefix(token_address).zfill(64),  # second argument: address
-            remove_0x_prefix(hex(len(bytes(token_type, 'utf-8')))).zfill(64),  # length of the dynamic argument
-            remove_0x_prefix(string_to_hash(token_type)).ljust(64, '0')  # left-aligned argument
-        ]
-        return await self._call(
-            self._registry,
-            self._get_final_full_token_balance + ''.join(words),
-            serializer=defi_sdk_full_token_balance_to_entity,
-            block=block
-        )
+        return await self._execute(self.final_full_token_balance_call(token_type, token_address), block)
 
     async def get_token_components(
             self,
@@ -185,7 +626,7 @@ class DeFiSDKAPIRepository(BaseEthereumRepository):
             block: Union[str, int] = 'latest'
     ) -> List[TokenBalance]:
         full_token_balance = await self.get_full_token_balance(token_type, token_address, block)
-        return full_token_balance.underlying_token_balances
+        return list(full_token_balance.underlying_token_balances)
 
     async def get_final_token_components(
             self,
@@ -194,7 +635,7 @@ class DeFiSDKAPIRepository(BaseEthereumRepository):
             block: Union[str, int] = 'latest'
     ) -> List[TokenBalance]:
         full_token_balance = await self.get_final_full_token_balance(token_type, token_address, block)
-        return full_token_balance.underlying_token_balances
+        return list(full_token_balance.underlying_token_balances)
 
     async def get_token_metadata(
             self,
@@ -1,43 +1,430 @@
+import asyncio
 import itertools
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import Executor
+from functools import partial
 
-from defisdk.errors import EthereumNodeEmptyResponse, EthereumNodeNoResponse, EthereumNodeResponseException
+import aiohttp
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from defisdk.abi import FUNCTION_NAMES
+from defisdk.cache import BaseCache
+from defisdk.errors import (
+    EthereumNodeEmptyResponse,
+    EthereumNodeExecutionReverted,
+    EthereumNodeLimitExceeded,
+    EthereumNodeNoResponse,
+    EthereumNodeRateLimited,
+    EthereumNodeResponseError,
+    EthereumNodeResponseException,
+    EthereumNodeServerError,
+    EthereumNodeTimeout,
+    EthereumNodeTransportError
+)
+from defisdk.instrumentation import CallMetrics, Hook, count_entities, emit
+from defisdk.limiters import AdaptiveConcurrencyLimiter, RateLimiter
+from defisdk.policies import RetryPolicy, classify_error
 from defisdk.repositories.base import BaseAPIRepository
-from defisdk.utils import represent_address
+from defisdk.repositories.nodes import NodeEndpoint, NodePool
+from defisdk.settings import DECODE_OFFLOAD_THRESHOLD, JSON_RPC_BATCH_SIZE
+from defisdk.utils import hash_to_int, represent_address
+
+RATE_LIMIT_ERROR_CODES = (-32005, 429)
+RATE_LIMIT_ERROR_MESSAGES = ('rate limit', 'too many requests', 'request limit')
+EXECUTION_ERROR_CODES = (3, -32015)
+EXECUTION_ERROR_MESSAGES = ('revert', 'out of gas', 'gas required exceeds', 'execution aborted')
+# response size and server-side timeout limits of node providers
+LIMIT_ERROR_MESSAGES = ('response size', 'response too large', 'response is too big', 'timed out', 'timeout exceeded')
+SERVER_ERROR_CODES = (-32603,)
+SERVER_ERROR_MESSAGES = ('internal error', 'internal server error', 'bad gateway', 'service unavailable')
+# errors of the node rather than of the request, the node is failed over and ranked behind the others
+NODE_ERRORS = (EthereumNodeRateLimited, EthereumNodeServerError)
+
+
+class JSONRPCBatch:
+
+    def __init__(self, repository: 'BaseEthereumRepository', window: float = 0, max_size: int = JSON_RPC_BATCH_SIZE):
+        self._repository = repository
+        self._window = window
+        self._max_size = max_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def submit(self, data: Dict[str, Any]) -> asyncio.Future:
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._pending.append((data, future))
+        if len(self._pending) >= self._max_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self.flush)
+        return future
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._send(pending))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def drain(self):
+        self.flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _send(self, pending: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        # the task inherited the context of the call that flushed it, the batch must not report into its metrics
+        self._repository._call_metrics.set(None)
+        try:
+            node_answer = await self._repository._send([data for data, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if isinstance(node_answer, list):
+            answers = {answer.get('id'): answer for answer in node_answer}
+        else:
+            # a node that rejects the whole batch answers with a single error object instead of an array
+            answers = {data['id']: node_answer for data, _ in pending}
+        for data, future in pending:
+            if not future.done():
+                future.set_result(answers.get(data['id']))
+
+
+def raw_result(result: str) -> str:
+    return result
 
 
 class BaseEthereumRepository(BaseAPIRepository):
+    _nodes: NodePool
+    # serializers too cheap to be worth a trip to the decode executor
+    _inline_serializers = frozenset({raw_result})
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+            self,
+            *args,
+            batch_window: Optional[float] = None,
+            batch_size: int = JSON_RPC_BATCH_SIZE,
+            cache: Optional[BaseCache] = None,
+            latest_cache_ttl: float = 0,
+            retry_policy: Optional[RetryPolicy] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+            coalesce: bool = True,
+            hooks: Sequence[Hook] = (),
+            decode_executor: Optional[Executor] = None,
+            decode_offload_threshold: int = DECODE_OFFLOAD_THRESHOLD,
+            **kwargs
+    ):
+        super().__init__(*args, **kwargs)
         self.request_counter = itertools.count()
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._rate_limiter = rate_limiter
+        self._concurrency_limiter = concurrency_limiter
+        self._cache = cache
+        self._latest_cache_ttl = latest_cache_ttl
+        self._coalesce = coalesce
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self._hooks = list(hooks)
+        self._call_metrics: ContextVar[Optional[CallMetrics]] = ContextVar('call_metrics', default=None)
+        self._decode_executor = decode_executor
+        self._decode_offload_threshold = decode_offload_threshold
+        self._batch_size = batch_size
+        self._auto_batch = JSONRPCBatch(self, batch_window, batch_size) if batch_window is not None else None
+        self._scoped_batch: ContextVar[Optional[JSONRPCBatch]] = ContextVar('scoped_batch', default=None)
 
     def prepare_rpc_request_body(self, method: str, params: Optional[List] = None) -> Dict[str, Any]:
         params = params or []
         return {"jsonrpc": "2.0", "method": method, "params": params or [], "id": next(self.request_counter)}
 
-    async def call_method(self, method: str, params: Optional[List] = None) -> Optional[Dict[str, Any]]:
+    @asynccontextmanager
+    async def batch(self, window: float = 0, max_size: Optional[int] = None):
+        batch = JSONRPCBatch(self, window, max_size or self._batch_size)
+        token = self._scoped_batch.set(batch)
+        try:
+            yield batch
+        finally:
+            self._scoped_batch.reset(token)
+            await batch.drain()
+
+    async def _send(self, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Any:
+        node_answer, leg = await self._nodes.request(lambda node: self._send_to_node(node, data))
+        metrics = self._call_metrics.get()
+        if metrics is not None:
+            # hedged legs run side by side, only the leg whose answer is used reports into the call
+            metrics.node = leg.node
+            metrics.network_seconds += leg.network_seconds
+            metrics.parse_seconds += leg.parse_seconds
+            metrics.response_bytes += leg.response_bytes
+        return node_answer
+
+    async def _send_to_node(
+            self,
+            node: NodeEndpoint,
+            data: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> Tuple[Any, Optional[CallMetrics]]:
         headers = {'Content-Type': 'application/json'}
-        data = self.prepare_rpc_request_body(method, params)
-        node_answer = None
+        metrics = self._call_metrics.get()
+        leg = CallMetrics(metrics.method, node=node.url) if metrics is not None else None
+        token = self._call_metrics.set(leg)
+        start = time.perf_counter()
+        try:
+            node_answer = await asyncio.wait_for(
+                self._post(url=node.url, headers=headers, data=data),
+                self._retry_policy.timeout
+            )
+        finally:
+            self._call_metrics.reset(token)
+            if leg is not None:
+                leg.network_seconds += time.perf_counter() - start
+        if isinstance(node_answer, list):
+            # a rate limited batch item means the node throttles this client, not that the request is wrong
+            requests = {request.get('id'): request for request in data}
+            for item in node_answer:
+                if isinstance(item, dict) and 'error' in item:
+                    error = self._node_error(requests.get(item.get('id'), {}).get('params'), item['error'])
+                    if isinstance(error, EthereumNodeRateLimited):
+                        raise error
+            return node_answer, leg
+        # an answer without result or error is the node's fault, so another node may still answer it
+        if not node_answer or ('result' not in node_answer and 'error' not in node_answer):
+            raise EthereumNodeNoResponse(node_answer)
+        if 'error' in node_answer:
+            # a node rejecting a whole batch answers it with a single error object
+            params = data.get('params') if isinstance(data, dict) else None
+            error = self._node_error(params, node_answer['error'])
+            if isinstance(error, NODE_ERRORS):
+                raise error
+        return node_answer, leg
+
+    @staticmethod
+    def _node_error(params: Optional[List], error: Dict[str, Any]) -> EthereumNodeResponseException:
+        message, code, data = error.get('message', ''), error.get('code'), error.get('data')
+        if code in RATE_LIMIT_ERROR_CODES or any(x in message.lower() for x in RATE_LIMIT_ERROR_MESSAGES):
+            return EthereumNodeRateLimited(params, message, code, data)
+        if code in EXECUTION_ERROR_CODES or any(x in message.lower() for x in EXECUTION_ERROR_MESSAGES):
+            return EthereumNodeExecutionReverted(params, message, code, data)
+        if any(x in message.lower() for x in LIMIT_ERROR_MESSAGES):
+            return EthereumNodeLimitExceeded(params, message, code, data)
+        if code in SERVER_ERROR_CODES or any(x in message.lower() for x in SERVER_ERROR_MESSAGES):
+            return EthereumNodeServerError(params, message, code, data)
+        return EthereumNodeResponseException(params, message, code, data)
+
+    @classmethod
+    def _check_node_answer(cls, params: Optional[List], node_answer: Optional[Dict[str, Any]]):
+        if node_answer and 'error' in node_answer:
+            raise cls._node_error(params, node_answer['error'])
+        if not node_answer or not node_answer.get('result'):
+            raise EthereumNodeNoResponse(node_answer)
+        if node_answer['result'] == '0x':
+            raise EthereumNodeEmptyResponse()
 
+    def _on_response(self, response_bytes: int, parse_seconds: float):
+        metrics = self._call_metrics.get()
+        if metrics is not None:
+            # parsing happens inside the timed network round trip
+            metrics.network_seconds -= parse_seconds
+            metrics.parse_seconds += parse_seconds
+            metrics.response_bytes += response_bytes
+
+    async def call_method(self, method: str, params: Optional[List] = None) -> Optional[Dict[str, Any]]:
+        if not self._hooks or self._call_metrics.get() is not None:
+            return await self._call_method_retrying(method, params)
+        metrics = CallMetrics(method)
+        token = self._call_metrics.set(metrics)
         try:
-            node_answer = await self._post(url=self.url.url, headers=headers, data=data)
+            return await self._call_method_retrying(method, params)
         except Exception as e:
-            raise EthereumNodeResponseException(params, e.message, e.code, e.response)
+            metrics.error = type(e).__name__
+            raise
         finally:
-            if not node_answer.get('result'):
-                raise EthereumNodeNoResponse(node_answer)
-            if node_answer['result'] == '0x':
-                raise EthereumNodeEmptyResponse()
-            if node_answer and 'error' in node_answer:
-                raise EthereumNodeResponseException(
-                    params, node_answer['error']['message'], node_answer['error']['code'], None
-                )
+            self._call_metrics.reset(token)
+            emit(self._hooks, metrics)
+
+    async def _call_method_retrying(self, method: str, params: Optional[List] = None) -> Optional[Dict[str, Any]]:
+        policy = self._retry_policy
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + policy.deadline if policy.deadline is not None else None
+        attempt = 0
+
+        while True:
+            try:
+                if deadline is None:
+                    return await self._call_method_limited(method, params)
+                try:
+                    return await asyncio.wait_for(self._call_method_limited(method, params), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    raise EthereumNodeTimeout()
+            except EthereumNodeResponseError as e:
+                delay = policy.backoff(attempt)
+                if attempt >= policy.retries or not policy.is_retryable(e):
+                    raise
+                if deadline is not None and loop.time() + delay >= deadline:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
 
+    async def _call_method_limited(self, method: str, params: Optional[List] = None) -> Dict[str, Any]:
+        metrics = self._call_metrics.get()
+        if metrics is not None:
+            metrics.attempts += 1
+        queued = time.perf_counter()
+        limiter = self._concurrency_limiter
+        if limiter is None:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire(method)
+            if metrics is not None:
+                metrics.queue_seconds += time.perf_counter() - queued
+            return await self._call_method_once(method, params)
+
+        await limiter.acquire()
+        latency, error = None, None
+        try:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire(method)
+            if metrics is not None:
+                metrics.queue_seconds += time.perf_counter() - queued
+            start = time.monotonic()
+            node_answer = await self._call_method_once(method, params)
+            latency = time.monotonic() - start
+            return node_answer
+        except EthereumNodeResponseError as e:
+            error = classify_error(e)
+            raise
+        finally:
+            limiter.release(latency, error)
+
+    async def _call_method_once(self, method: str, params: Optional[List] = None) -> Dict[str, Any]:
+        data = self.prepare_rpc_request_body(method, params)
+        batch = self._scoped_batch.get() or self._auto_batch
+
+        try:
+            if batch is not None:
+                metrics = self._call_metrics.get()
+                if metrics is None:
+                    node_answer = await batch.submit(data)
+                else:
+                    # a batched call only knows its share of the wait, not the node or the size of its answer
+                    metrics.batched = True
+                    start = time.perf_counter()
+                    try:
+                        node_answer = await batch.submit(data)
+                    finally:
+                        metrics.network_seconds += time.perf_counter() - start
+            else:
+                node_answer = await self._send(data)
+        except EthereumNodeResponseError:
+            raise
+        except asyncio.TimeoutError:
+            raise EthereumNodeTimeout()
+        except aiohttp.ClientResponseError as e:
+            if e.status == 429:
+                raise EthereumNodeRateLimited(params, e.message, e.status, None)
+            raise EthereumNodeTransportError(f'{e.status}: {e.message}')
+        except aiohttp.ClientError as e:
+            raise EthereumNodeTransportError(str(e) or type(e).__name__)
+
+        self._check_node_answer(params, node_answer)
         return node_answer
 
-    async def _call(self, _to: str, data: str, serializer=lambda x: x, block='latest'):
+    def _cache_policy(self, block: Union[str, int]) -> Tuple[bool, Optional[float]]:
+        # responses pinned to a block number never change; 'latest' may be kept briefly, anything else never
+        if isinstance(block, int):
+            return True, None
+        if block == 'latest' and self._latest_cache_ttl > 0:
+            return True, self._latest_cache_ttl
+        return False, None
+
+    async def _call(self, _to: str, data: str, serializer=raw_result, block='latest'):
+        if not self._coalesce:
+            return await self._call_once(_to, data, serializer, block)
+
+        # identical in-flight calls share one request and one decoded result
+        key = (_to.lower(), block, data, serializer)
+        future = self._in_flight.get(key)
+        shared = future is not None
+        if not shared:
+            future = asyncio.ensure_future(self._call_once(_to, data, serializer, block))
+            self._in_flight[key] = future
+            future.add_done_callback(partial(self._call_done, key))
+        result = await asyncio.shield(future)
+        return list(result) if shared and isinstance(result, list) else result
+
+    def _call_done(self, key: Tuple, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # every waiter may have been cancelled, the error must still be retrieved
+        if not future.cancelled():
+            future.exception()
+
+    async def _call_once(self, _to: str, data: str, serializer, block: Union[str, int]):
+        if not self._hooks:
+            return await self._call_uninstrumented(_to, data, serializer, block)
+        metrics = CallMetrics(
+            'eth_call',
+            function=FUNCTION_NAMES.get(data[:10]),
+            target=_to,
+            block=hex(block) if isinstance(block, int) else block
+        )
+        token = self._call_metrics.set(metrics)
+        try:
+            return await self._call_uninstrumented(_to, data, serializer, block)
+        except Exception as e:
+            metrics.error = type(e).__name__
+            raise
+        finally:
+            self._call_metrics.reset(token)
+            emit(self._hooks, metrics)
+
+    async def _call_uninstrumented(self, _to: str, data: str, serializer, block: Union[str, int]):
+        cacheable, ttl = self._cache_policy(block) if self._cache is not None else (False, None)
         block = hex(block) if isinstance(block, int) else block
         params = [{'to': represent_address(_to), 'data': data}, block]
-        node_answer = await self.call_method('eth_call', params)
-        return serializer(node_answer['result'])
+        cache_key = f'{params[0]["to"]}:{block}:{data}' if cacheable else None
+
+        result = self._cache.get(cache_key) if cacheable else None
+        if result is None:
+            node_answer = await self.call_method('eth_call', params)
+            result = node_answer['result']
+            if cacheable:
+                self._cache.set(cache_key, result, ttl)
+        metrics = self._call_metrics.get()
+        if metrics is None:
+            return await self._decode(serializer, result)
+        metrics.cached = metrics.attempts == 0
+        start = time.perf_counter()
+        decoded = await self._decode(serializer, result)
+        metrics.decode_seconds = time.perf_counter() - start
+        metrics.entities = count_entities(decoded)
+        return decoded
+
+    def _offloads(self, serializer, result: str) -> bool:
+        return (
+            self._decode_executor is not None
+            and len(result) >= self._decode_offload_threshold
+            and serializer not in self._inline_serializers
+        )
+
+    async def _decode(self, serializer, result: str) -> Any:
+        if not self._offloads(serializer, result):
+            return serializer(result)
+        # a process pool pickles the serializer and the decoded tree, serializers are partials of module functions
+        return await asyncio.get_running_loop().run_in_executor(self._decode_executor, serializer, result)
+
+    async def get_block_number(self) -> int:
+        node_answer = await self.call_method('eth_blockNumber')
+        return hash_to_int(node_answer['result'])
+
+    async def aclose(self):
+        if self._auto_batch is not None:
+            await self._auto_batch.drain()
+        await super().aclose()
@@ -0,0 +1,181 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Sequence, Union
+
+import aiohttp
+
+from defisdk.errors import EthereumNodeNoResponse, EthereumNodeRateLimited, EthereumNodeServerError
+
+# errors of the node rather than of the request, another node may still answer it
+FAILOVER_ERRORS = (
+    EthereumNodeNoResponse,
+    EthereumNodeRateLimited,
+    EthereumNodeServerError,
+    asyncio.TimeoutError,
+    aiohttp.ClientError
+)
+EXPLORATION_HEDGE_PERCENTILE = 99
+
+
+class NodeEndpoint:
+
+    def __init__(
+            self,
+            url: str,
+            weight: float = 1.0,
+            decay: float = 0.2,
+            window: int = 100,
+            failure_latency: float = 1.0
+    ):
+        self.url = url
+        self.weight = weight
+        self.failure_latency = failure_latency
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.last_failure: Optional[float] = None
+        self._decay = decay
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def __repr__(self):
+        return f'NodeEndpoint({self.url!r}, weight={self.weight})'
+
+    @property
+    def score(self) -> float:
+        # lower is better: slow, failing and busy nodes are pushed back, heavier weights pulled forward
+        return (self.latency or 0.001) * (1 + self.in_flight) * (1 + 10 * self.error_rate) / self.weight
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile / 100))]
+
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.latency = latency if not self._latencies else self.latency + self._decay * (latency - self.latency)
+        self.error_rate -= self._decay * self.error_rate
+        self._latencies.append(latency)
+
+    def record_failure(self, elapsed: float = 0.0):
+        self.requests += 1
+        self.errors += 1
+        self.last_failure = time.monotonic()
+        self.error_rate += self._decay * (1 - self.error_rate)
+        # a node refusing connections fails fast, it must not look faster than a slow healthy node
+        penalty = max(elapsed, self.failure_latency)
+        self.latency = penalty if not self.latency else self.latency + self._decay * (penalty - self.latency)
+
+
+class NodePool:
+
+    def __init__(
+            self,
+            endpoints: Sequence[Union[str, NodeEndpoint]],
+            hedge_percentile: Optional[float] = None,
+            hedge_min_samples: int = 20,
+            exploration: float = 0.05,
+            exploration_cooldown: float = 30.0
+    ):
+        if not endpoints:
+            raise ValueError('At least one node endpoint is required')
+        self.endpoints: List[NodeEndpoint] = [
+            endpoint if isinstance(endpoint, NodeEndpoint) else NodeEndpoint(endpoint) for endpoint in endpoints
+        ]
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_samples = hedge_min_samples
+        self._exploration = exploration
+        self._exploration_cooldown = exploration_cooldown
+
+    def ranked(self) -> List[NodeEndpoint]:
+        endpoints = sorted(self.endpoints, key=lambda endpoint: endpoint.score)
+        # scores only change when a node gets traffic, so now and then try another node first to let it recover
+        if len(endpoints) > 1 and random.random() < self._exploration:
+            # a node that failed recently may hang, trying it now would stall the request for a whole timeout
+            now = time.monotonic()
+            candidates = [
+                index for index, endpoint in enumerate(endpoints) if index and (
+                    endpoint.last_failure is None or now - endpoint.last_failure >= self._exploration_cooldown
+                )
+            ]
+            if candidates:
+                endpoints.insert(0, endpoints.pop(random.choice(candidates)))
+        return endpoints
+
+    async def request(self, send: Callable[[NodeEndpoint], Awaitable[Any]]) -> Any:
+        endpoints = self.ranked()
+        # an explored node is hedged to the best one once the best one would usually have answered
+        best = min(endpoints, key=lambda endpoint: endpoint.score)
+        reference = best if endpoints[0] is not best else None
+        error = None
+        while endpoints:
+            try:
+                return await self._hedged(endpoints, send, reference)
+            except FAILOVER_ERRORS as e:
+                error = e
+            reference = None
+        raise error
+
+    def _hedge_delay(self, endpoint: NodeEndpoint, percentile: float) -> Optional[float]:
+        if len(endpoint._latencies) < self._hedge_min_samples:
+            return None
+        return endpoint.latency_percentile(percentile)
+
+    async def _hedged(
+            self,
+            endpoints: List[NodeEndpoint],
+            send: Callable[[NodeEndpoint], Awaitable[Any]],
+            reference: Optional[NodeEndpoint] = None
+    ) -> Any:
+        # takes the primary, and the secondary once it is hedged to, off the endpoints left to try
+        primary = endpoints.pop(0)
+        delay = None
+        if endpoints and reference is not None:
+            delay = self._hedge_delay(reference, self._hedge_percentile or EXPLORATION_HEDGE_PERCENTILE)
+        elif endpoints and self._hedge_percentile is not None:
+            delay = self._hedge_delay(primary, self._hedge_percentile)
+        if delay is None:
+            return await self._timed(primary, send)
+
+        tasks = {asyncio.ensure_future(self._timed(primary, send))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                tasks.add(asyncio.ensure_future(self._timed(endpoints.pop(0), send)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+                task.add_done_callback(_consume_result)
+
+    @staticmethod
+    async def _timed(endpoint: NodeEndpoint, send: Callable[[NodeEndpoint], Awaitable[Any]]) -> Any:
+        endpoint.in_flight += 1
+        start = time.monotonic()
+        try:
+            result = await send(endpoint)
+        except FAILOVER_ERRORS:
+            endpoint.record_failure(time.monotonic() - start)
+            raise
+        else:
+            endpoint.record_success(time.monotonic() - start)
+            return result
+        finally:
+            endpoint.in_flight -= 1
+
+
+def _consume_result(task: asyncio.Future):
+    # a cancelled hedge may still finish with an error nobody awaits any more
+    if not task.cancelled():
+        task.exception()
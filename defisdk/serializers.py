@@ -1,10 +1,24 @@
-from typing import List
-
+from functools import partial
+from typing import List, Tuple
+
+from defisdk.decoder import (
+    AmountConverter,
+    decode_list,
+    hash_to_bytes,
+    read_address,
+    read_adapter_balance,
+    read_asset_balance,
+    read_int,
+    read_multicall_result,
+    read_protocol_balance,
+    read_string
+)
 from defisdk.entities import (
     AdapterBalance, AdapterMetadata, AssetBalance, ProtocolBalance, ProtocolMetadata, TokenBalance, TokenMetadata
 )
+from defisdk.lazy import LazyAdapterBalance, LazyProtocolBalance
 from defisdk.utils import (
-    hash_to_address, hash_to_decimal, hash_to_int, hash_to_list, hash_to_words, words_to_list, words_to_string
+    hash_to_address, hash_to_decimal, hash_to_int, int_to_decimal, represent_hash, words_to_list, words_to_string
 )
 
 
@@ -37,11 +51,11 @@ def defi_sdk_asset_balance_to_entity(words: List[str], rate: bool = False) -> As
     base_location = hash_to_int(words[0]) // 32
     underlying_location = hash_to_int(words[1]) // 32
     base_balance = defi_sdk_token_balance_to_entity(words[base_location:underlying_location], rate=rate)
-    underlying_balances = words_to_list(
+    underlying_balances = tuple(words_to_list(
         words[underlying_location:],
         lambda x: defi_sdk_token_balance_to_entity(x, rate=rate, base_token_decimals=base_balance.metadata.decimals),
         True
-    )
+    ))
     return AssetBalance(
         base_token_balance=base_balance,
         underlying_token_balances=underlying_balances
@@ -60,7 +74,7 @@ def defi_sdk_adapter_balance_to_entity(words: List[str]) -> AdapterBalance:
     metadata_location = hash_to_int(words[0]) // 32
     balances_location = hash_to_int(words[1]) // 32
     metadata = defi_sdk_adapter_metadata_to_entity(words[metadata_location:balances_location])
-    balances = words_to_list(words[balances_location:], defi_sdk_asset_balance_to_entity, True)
+    balances = tuple(words_to_list(words[balances_location:], defi_sdk_asset_balance_to_entity, True))
     return AdapterBalance(
         metadata=metadata,
         asset_balances=balances
@@ -85,28 +99,69 @@ def defi_sdk_protocol_balance_to_entity(words: List[str]) -> ProtocolBalance:
     metadata_location = hash_to_int(words[0]) // 32
     balances_location = hash_to_int(words[1]) // 32
     metadata = defi_sdk_protocol_metadata_to_entity(words[metadata_location:balances_location])
-    balances = words_to_list(words[balances_location:], defi_sdk_adapter_balance_to_entity, True)
+    balances = tuple(words_to_list(words[balances_location:], defi_sdk_adapter_balance_to_entity, True))
     return ProtocolBalance(
         metadata=metadata,
         adapter_balances=balances
     )
 
 
-def defi_sdk_protocol_balances_to_entity(data: str) -> List[ProtocolBalance]:
-    return hash_to_list(data, defi_sdk_protocol_balance_to_entity, dynamic_elements=True)
+def defi_sdk_protocol_balances_to_entity(
+        data: str,
+        amount_converter: AmountConverter = int_to_decimal,
+        lazy: bool = False
+) -> List[ProtocolBalance]:
+    decoder = LazyProtocolBalance if lazy else read_protocol_balance
+    return decode_list(data, partial(decoder, amount_converter=amount_converter), dynamic_elements=True)
+
+
+def defi_sdk_adapter_balances_to_entity(
+        data: str,
+        amount_converter: AmountConverter = int_to_decimal,
+        lazy: bool = False
+) -> List[AdapterBalance]:
+    decoder = LazyAdapterBalance if lazy else read_adapter_balance
+    return decode_list(data, partial(decoder, amount_converter=amount_converter), dynamic_elements=True)
+
 
+def defi_sdk_first_protocol_balance_to_entity(
+        data: str,
+        amount_converter: AmountConverter = int_to_decimal,
+        lazy: bool = False
+) -> ProtocolBalance:
+    return defi_sdk_protocol_balances_to_entity(data, amount_converter, lazy)[0]
 
-def defi_sdk_adapter_balances_to_entity(data: str) -> List[AdapterBalance]:
-    return hash_to_list(data, defi_sdk_adapter_balance_to_entity, dynamic_elements=True)
+
+def defi_sdk_first_adapter_balance_to_entity(
+        data: str,
+        amount_converter: AmountConverter = int_to_decimal,
+        lazy: bool = False
+) -> AdapterBalance:
+    return defi_sdk_adapter_balances_to_entity(data, amount_converter, lazy)[0]
 
 
 def defi_sdk_token_adapter_names_to_list_of_string(data: str) -> List[str]:
-    return hash_to_list(data, words_to_string, dynamic_elements=True)
+    return decode_list(data, read_string, dynamic_elements=True)
 
 
 def defi_sdk_protocol_names_to_list_of_string(data: str) -> List[str]:
-    return hash_to_list(data, words_to_string, dynamic_elements=True)
+    return decode_list(data, read_string, dynamic_elements=True)
+
+
+def defi_sdk_protocol_adapters_to_list_of_string(data: str) -> List[str]:
+    return decode_list(data, read_address)
+
+
+def defi_sdk_full_token_balance_to_entity(
+        data: str,
+        amount_converter: AmountConverter = int_to_decimal
+) -> AssetBalance:
+    data = hash_to_bytes(data)
+    return read_asset_balance(data, read_int(data, 0), rate=True, amount_converter=amount_converter)
 
 
-def defi_sdk_full_token_balance_to_entity(data: str) -> AssetBalance:
-    return defi_sdk_asset_balance_to_entity(hash_to_words(data)[1:], rate=True)
+def multicall_results_to_list(data: str) -> List[Tuple[bool, str]]:
+    return [
+        (success, represent_hash(return_data))
+        for success, return_data in decode_list(data, read_multicall_result, dynamic_elements=True)
+    ]
@@ -1,3 +1,27 @@
 import os
 
 DEFI_SDK_REGISTRY = os.getenv('DEFI_SDK_REGISTRY', '0x06fe76b2f432fdfecaef1a7d4f6c3d41b5861672')
+
+HTTP_CONNECTION_LIMIT = int(os.getenv('DEFI_SDK_HTTP_CONNECTION_LIMIT', '100'))
+HTTP_CONNECTION_LIMIT_PER_HOST = int(os.getenv('DEFI_SDK_HTTP_CONNECTION_LIMIT_PER_HOST', '0'))
+HTTP_DNS_CACHE_TTL = int(os.getenv('DEFI_SDK_HTTP_DNS_CACHE_TTL', '300'))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('DEFI_SDK_HTTP_KEEPALIVE_TIMEOUT', '30'))
+
+JSON_RPC_BATCH_SIZE = int(os.getenv('DEFI_SDK_JSON_RPC_BATCH_SIZE', '100'))
+
+MULTICALL_ADDRESS = os.getenv('DEFI_SDK_MULTICALL', '0x5ba1e12693dc8f9c48aad8770482f4739beed696')
+MULTICALL_SIZE = int(os.getenv('DEFI_SDK_MULTICALL_SIZE', '50'))
+
+# seconds before a failed registry snapshot warm-up is retried, doubled on every consecutive failure
+REGISTRY_RETRY_BACKOFF = float(os.getenv('DEFI_SDK_REGISTRY_RETRY_BACKOFF', '1'))
+
+BALANCES_CHUNK_SIZE = int(os.getenv('DEFI_SDK_BALANCES_CHUNK_SIZE', '20'))
+BALANCES_SPLIT_ACCOUNTS = int(os.getenv('DEFI_SDK_BALANCES_SPLIT_ACCOUNTS', '10000'))
+ACTIVE_ADAPTERS_ACCOUNTS = int(os.getenv('DEFI_SDK_ACTIVE_ADAPTERS_ACCOUNTS', '10000'))
+
+# responses longer than this (hex characters) are decoded in the decode executor, when one is set
+DECODE_OFFLOAD_THRESHOLD = int(os.getenv('DEFI_SDK_DECODE_OFFLOAD_THRESHOLD', '65536'))
+
+BULK_CONCURRENCY = int(os.getenv('DEFI_SDK_BULK_CONCURRENCY', '32'))
+
+WATCHER_POLL_INTERVAL = float(os.getenv('DEFI_SDK_WATCHER_POLL_INTERVAL', '2'))
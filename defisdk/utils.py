@@ -1,11 +1,14 @@
 from binascii import unhexlify
-from decimal import Decimal
+from decimal import Context, Decimal
 from typing import Any, Callable, List, Union
 
 from sha3 import keccak_256
 
 from .enums import AdapterType
 
+# wide enough to hold any 256-bit integer, so scaling never rounds
+DECIMAL_CONTEXT = Context(prec=80)
+
 
 def remove_0x_prefix(passed_hash: str) -> str:
     return passed_hash[2:] if passed_hash.startswith("0x") else passed_hash
@@ -34,12 +37,12 @@ def hash_to_int(passed_hash: str, unsigned: bool = True) -> int:
     return int(passed_hash, 16)
 
 
+def int_to_decimal(value: int, decimals: int = 18) -> Decimal:
+    return Decimal(value).scaleb(-decimals, DECIMAL_CONTEXT)
+
+
 def hash_to_decimal(passed_hash: str, decimals: int = 18) -> Decimal:
-    value = hash_to_int(passed_hash)
-    sign = int(value <= 0)
-    digits = tuple(int(digit) for digit in str(abs(value)))
-    exponent = -decimals
-    return Decimal((sign, digits, exponent))
+    return int_to_decimal(hash_to_int(passed_hash), decimals)
 
 
 def hash_to_bool(passed_hash: str) -> bool:
@@ -0,0 +1,127 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from defisdk.concurrency import bounded_map
+from defisdk.entities import AssetBalance, BalanceChange, ProtocolBalance
+from defisdk.errors import EthereumNodeResponseError
+from defisdk.settings import BULK_CONCURRENCY, WATCHER_POLL_INTERVAL
+from defisdk.utils import represent_address
+
+PositionKey = Tuple[str, str, str]
+
+
+def balances_to_positions(protocol_balances: List[ProtocolBalance]) -> Dict[PositionKey, AssetBalance]:
+    positions = {}
+    for protocol_balance in protocol_balances:
+        for adapter_balance in protocol_balance.adapter_balances:
+            for asset_balance in adapter_balance.asset_balances:
+                key = (
+                    protocol_balance.metadata.name,
+                    adapter_balance.metadata.address,
+                    asset_balance.base_token_balance.metadata.address
+                )
+                positions[key] = asset_balance
+    return positions
+
+
+def diff_positions(
+        account: str,
+        block: int,
+        old: Dict[PositionKey, AssetBalance],
+        new: Dict[PositionKey, AssetBalance]
+) -> List[BalanceChange]:
+    changes = []
+    for key, asset_balance in new.items():
+        previous = old.get(key)
+        if previous != asset_balance:
+            changes.append(BalanceChange(account, block, *key, previous, asset_balance))
+    for key, asset_balance in old.items():
+        if key not in new:
+            changes.append(BalanceChange(account, block, *key, asset_balance, None))
+    return changes
+
+
+class BalanceWatcher:
+
+    def __init__(
+            self,
+            get_block_number: Callable[[], Awaitable[int]],
+            fetch: Callable[[str, int], Awaitable[str]],
+            decode: Callable[[str], Awaitable[List[ProtocolBalance]]],
+            accounts: Iterable[str] = (),
+            poll_interval: float = WATCHER_POLL_INTERVAL,
+            concurrency: int = BULK_CONCURRENCY
+    ):
+        self._get_block_number = get_block_number
+        self._fetch = fetch
+        self._decode = decode
+        self._poll_interval = poll_interval
+        self._concurrency = concurrency
+        # the raw response is kept next to the positions, so an unchanged account is never decoded again
+        self._snapshots: Dict[str, Tuple[Optional[str], Dict[PositionKey, AssetBalance]]] = {}
+        self.accounts = {represent_address(account) for account in accounts}
+        self.block: Optional[int] = None
+        self.errors: Dict[str, Exception] = {}
+        # the error of the last poll of the stream, the block number is read once for every account
+        self.poll_error: Optional[Exception] = None
+
+    def add_account(self, account: str):
+        self.accounts.add(represent_address(account))
+
+    def remove_account(self, account: str):
+        account = represent_address(account)
+        self.accounts.discard(account)
+        self._snapshots.pop(account, None)
+        self.errors.pop(account, None)
+
+    def positions(self, account: str) -> Dict[PositionKey, AssetBalance]:
+        return dict(self._snapshots.get(represent_address(account), (None, {}))[1])
+
+    async def refresh(self, block: int) -> List[BalanceChange]:
+        changes = []
+        async for account, response in bounded_map(
+                lambda address: self._fetch(address, block),
+                list(self.accounts),
+                self._concurrency
+        ):
+            if account not in self.accounts:
+                continue
+            if isinstance(response, Exception):
+                # the account keeps its last snapshot and is compared against it on the next block
+                self.errors[account] = response
+                continue
+            self.errors.pop(account, None)
+            old_response, old_positions = self._snapshots.get(account, (None, {}))
+            if response == old_response:
+                continue
+            try:
+                positions = balances_to_positions(await self._decode(response))
+            except Exception as e:
+                self.errors[account] = e
+                continue
+            self._snapshots[account] = (response, positions)
+            changes.extend(diff_positions(account, block, old_positions, positions))
+        self.block = block
+        return changes
+
+    async def poll(self) -> List[BalanceChange]:
+        block = await self._get_block_number()
+        if self.block is not None and block <= self.block:
+            return []
+        return await self.refresh(block)
+
+    async def __aiter__(self) -> AsyncIterator[BalanceChange]:
+        while True:
+            block = self.block
+            try:
+                changes = await self.poll()
+            except EthereumNodeResponseError as e:
+                # a node outage must not end the stream, the next poll tries again
+                self.poll_error = e
+                changes = []
+            else:
+                self.poll_error = None
+            for change in changes:
+                yield change
+            if self.block == block:
+                await asyncio.sleep(self._poll_interval)
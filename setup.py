@@ -24,5 +24,11 @@ setup(
         'furl==2.1.3',
         'pysha3==1.0.2',
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'numpy': ['numpy'],
+        'opentelemetry': ['opentelemetry-api'],
+        'prometheus': ['prometheus_client'],
+    },
     python_requires='>=3.7',
 )
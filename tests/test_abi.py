@@ -0,0 +1,146 @@
+import pytest
+
+from defisdk.abi import (
+    FixedArray,
+    FunctionEncoder,
+    compile_encoder,
+    encode_arguments,
+    head_size,
+    is_dynamic,
+    parse_types
+)
+
+ADDRESS = '0x' + 'ab' * 20
+OTHER_ADDRESS = '0x' + 'cd' * 20
+LONG_NAME = 'Ünïcödé protocol name longer than thirty-two bytes'
+
+# reference encodings produced by eth_abi
+REFERENCE = [
+    pytest.param(
+        ('uint256', 'int256', 'address', 'bool'),
+        [1, -1, ADDRESS, True],
+        '0000000000000000000000000000000000000000000000000000000000000001'
+        'ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff'
+        '000000000000000000000000abababababababababababababababababababab'
+        '0000000000000000000000000000000000000000000000000000000000000001',
+        id='static_elementary'
+    ),
+    pytest.param(
+        ('string', 'bytes'),
+        [LONG_NAME, b'\x01\x02'],
+        '0000000000000000000000000000000000000000000000000000000000000040'
+        '00000000000000000000000000000000000000000000000000000000000000a0'
+        '0000000000000000000000000000000000000000000000000000000000000036'
+        'c39c6ec3af63c3b664c3a92070726f746f636f6c206e616d65206c6f6e676572'
+        '207468616e207468697274792d74776f20627974657300000000000000000000'
+        '0000000000000000000000000000000000000000000000000000000000000002'
+        '0102000000000000000000000000000000000000000000000000000000000000',
+        id='dynamic_bytes'
+    ),
+    pytest.param(
+        ('address[]',),
+        [[ADDRESS, OTHER_ADDRESS]],
+        '0000000000000000000000000000000000000000000000000000000000000020'
+        '0000000000000000000000000000000000000000000000000000000000000002'
+        '000000000000000000000000abababababababababababababababababababab'
+        '000000000000000000000000cdcdcdcdcdcdcdcdcdcdcdcdcdcdcdcdcdcdcdcd',
+        id='dynamic_array'
+    ),
+    pytest.param(
+        ('uint256[2]', 'string'),
+        [[7, 8], 'x'],
+        '0000000000000000000000000000000000000000000000000000000000000007'
+        '0000000000000000000000000000000000000000000000000000000000000008'
+        '0000000000000000000000000000000000000000000000000000000000000060'
+        '0000000000000000000000000000000000000000000000000000000000000001'
+        '7800000000000000000000000000000000000000000000000000000000000000',
+        id='static_fixed_array'
+    ),
+    pytest.param(
+        ('string[2]',),
+        [['a', 'b' * 40]],
+        '0000000000000000000000000000000000000000000000000000000000000020'
+        '0000000000000000000000000000000000000000000000000000000000000040'
+        '0000000000000000000000000000000000000000000000000000000000000080'
+        '0000000000000000000000000000000000000000000000000000000000000001'
+        '6100000000000000000000000000000000000000000000000000000000000000'
+        '0000000000000000000000000000000000000000000000000000000000000028'
+        '6262626262626262626262626262626262626262626262626262626262626262'
+        '6262626262626262000000000000000000000000000000000000000000000000',
+        id='dynamic_fixed_array'
+    ),
+    pytest.param(
+        ([('address', 'string')],),
+        [[(ADDRESS, 'Asset'), (ADDRESS, 'Debt')]],
+        '0000000000000000000000000000000000000000000000000000000000000020'
+        '0000000000000000000000000000000000000000000000000000000000000002'
+        '0000000000000000000000000000000000000000000000000000000000000040'
+        '00000000000000000000000000000000000000000000000000000000000000c0'
+        '000000000000000000000000abababababababababababababababababababab'
+        '0000000000000000000000000000000000000000000000000000000000000040'
+        '0000000000000000000000000000000000000000000000000000000000000005'
+        '4173736574000000000000000000000000000000000000000000000000000000'
+        '000000000000000000000000abababababababababababababababababababab'
+        '0000000000000000000000000000000000000000000000000000000000000040'
+        '0000000000000000000000000000000000000000000000000000000000000004'
+        '4465627400000000000000000000000000000000000000000000000000000000',
+        id='tuple_array'
+    ),
+    pytest.param(
+        (FixedArray(('uint256', 'bool'), 2), 'uint8'),
+        [[(1, True), (2, False)], 3],
+        '0000000000000000000000000000000000000000000000000000000000000001'
+        '0000000000000000000000000000000000000000000000000000000000000001'
+        '0000000000000000000000000000000000000000000000000000000000000002'
+        '0000000000000000000000000000000000000000000000000000000000000000'
+        '0000000000000000000000000000000000000000000000000000000000000003',
+        id='fixed_tuple_array'
+    ),
+]
+
+
+
+@pytest.mark.parametrize('types, values, expected', REFERENCE)
+def test_encode_arguments_matches_reference(types, values, expected):
+    assert encode_arguments(types, values) == expected
+
+
+def test_function_encoder_matches_reference():
+    encoder = FunctionEncoder('getProtocolBalances(address,string[])')
+    assert encoder.selector == '0x85c6a793'
+    assert encoder(ADDRESS, ['Uniswap V2', 'Compound']) == encoder.selector + (
+        '000000000000000000000000abababababababababababababababababababab'
+        '0000000000000000000000000000000000000000000000000000000000000040'
+        '0000000000000000000000000000000000000000000000000000000000000002'
+        '0000000000000000000000000000000000000000000000000000000000000040'
+        '0000000000000000000000000000000000000000000000000000000000000080'
+        '000000000000000000000000000000000000000000000000000000000000000a'
+        '556e697377617020563200000000000000000000000000000000000000000000'
+        '0000000000000000000000000000000000000000000000000000000000000008'
+        '436f6d706f756e64000000000000000000000000000000000000000000000000'
+    )
+
+
+def test_parse_types():
+    assert parse_types('(address,string[],(uint256,bool)[2],bytes[][3])') == (
+        'address', ['string'], FixedArray(('uint256', 'bool'), 2), FixedArray(['bytes'], 3)
+    )
+
+
+@pytest.mark.parametrize('types', ['(uint256[2)', '(uint256[x])', '(uint256', '(uint256))'])
+def test_parse_types_rejects_invalid_types(types):
+    with pytest.raises(ValueError):
+        parse_types(types)
+
+
+def test_fixed_arrays_of_static_types_are_static():
+    assert not is_dynamic('uint256[2]')
+    assert head_size('uint256[2]') == 64
+    assert head_size(FixedArray(('uint256', 'bool'), 3)) == 192
+    assert is_dynamic('string[2]')
+    assert head_size('string[2]') == 32
+
+
+def test_fixed_array_length_is_checked():
+    with pytest.raises(ValueError):
+        compile_encoder('uint256[2]')([1, 2, 3])
@@ -0,0 +1,91 @@
+import asyncio
+
+from benchmarks.fixtures import ADAPTER_BALANCE, PROTOCOL_BALANCE
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.abi import encode_arguments
+from defisdk.decoder import read_address, read_array, read_int
+from defisdk.repositories.defi import GET_ADAPTER_BALANCES, GET_BALANCES
+from tests.transport import ScriptedTransport
+
+ACCOUNT = '0x' + '11' * 20
+AAVE_LENDING, AAVE_DEBT, CURVE_POOL = '0x' + 'a1' * 20, '0x' + 'a2' * 20, '0x' + 'c1' * 20
+TOKEN = ('0x' + 'd0' * 20, 'Dai', 'DAI', 18)
+# protocol -> adapters holding a position, the registry knows many more adapters without one
+POSITIONS = {
+    'Aave': [(AAVE_LENDING, 'Asset'), (AAVE_DEBT, 'Debt')],
+    'Curve': [(CURVE_POOL, 'Asset')],
+}
+
+
+def adapter_balance(address, adapter_type):
+    return (address, adapter_type), [((TOKEN, 10 ** 18), [])]
+
+
+def balances_node():
+    adapters = {
+        address: adapter_balance(address, kind) for positions in POSITIONS.values() for address, kind in positions
+    }
+
+    def handler(request):
+        data = request['params'][0]['data']
+        if data.startswith(GET_BALANCES.selector):
+            balances = [
+                ((name, '', '', '', 1), [adapter_balance(*adapter) for adapter in positions])
+                for name, positions in POSITIONS.items()
+            ]
+            return {'result': '0x' + encode_arguments([[PROTOCOL_BALANCE]], [balances])}
+        assert data.startswith(GET_ADAPTER_BALANCES.selector)
+        requested = requested_adapters(request)
+        return {'result': '0x' + encode_arguments([[ADAPTER_BALANCE]], [[adapters[a] for a in requested]])}
+    return ScriptedTransport(handler)
+
+
+def requested_adapters(request):
+    data = bytes.fromhex(request['params'][0]['data'][10:])
+    return read_array(data, read_int(data, 32), read_address)
+
+
+def selectors(transport):
+    return [request['params'][0]['data'][:10] for request in transport.requests]
+
+
+def run_sdk(transport, scenario, rescan_interval=60):
+    async def run():
+        async with DeFiSDK(
+                'http://node',
+                transport=transport,
+                retry_policy=RetryPolicy(retries=0),
+                active_adapters_rescan_interval=rescan_interval
+        ) as sdk:
+            return await scenario(sdk)
+    return asyncio.run(run())
+
+
+def test_indexed_account_queries_only_its_active_adapters():
+    transport = balances_node()
+
+    async def scenario(sdk):
+        return await sdk.get_account_balance(ACCOUNT), await sdk.get_account_balance(ACCOUNT)
+
+    full, indexed = run_sdk(transport, scenario)
+    assert selectors(transport) == [GET_BALANCES.selector, GET_ADAPTER_BALANCES.selector]
+    assert requested_adapters(transport.requests[1]) == [AAVE_LENDING, AAVE_DEBT, CURVE_POOL]
+    assert indexed == full
+    assert [(b.metadata.name, len(b.adapter_balances)) for b in indexed] == [('Aave', 2), ('Curve', 1)]
+
+
+def test_index_is_rebuilt_after_the_rescan_interval_and_on_invalidation():
+    transport = balances_node()
+
+    async def scenario(sdk):
+        await sdk.get_account_balance(ACCOUNT)
+        await asyncio.sleep(0.06)
+        await sdk.get_account_balance(ACCOUNT)
+        await sdk.get_account_balance(ACCOUNT)
+        sdk.invalidate_active_adapters(ACCOUNT)
+        await sdk.get_account_balance(ACCOUNT)
+
+    run_sdk(transport, scenario, rescan_interval=0.05)
+    assert selectors(transport) == [
+        GET_BALANCES.selector, GET_BALANCES.selector, GET_ADAPTER_BALANCES.selector, GET_BALANCES.selector
+    ]
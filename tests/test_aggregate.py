@@ -0,0 +1,86 @@
+import asyncio
+
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.abi import encode_arguments
+from defisdk.decoder import read_array, read_int
+from defisdk.errors import EthereumNodeEmptyResponse, EthereumNodeResponseException, MulticallCallFailed
+from defisdk.repositories.defi import (
+    GET_PROTOCOL_ADAPTERS,
+    GET_PROTOCOL_NAMES,
+    GET_TOKEN_ADAPTER,
+    GET_TOKEN_ADAPTER_NAMES,
+    TRY_AGGREGATE
+)
+from tests.test_registry import read_call
+from tests.transport import ScriptedTransport, error
+
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, 'big')
+
+
+# a string array holding one name that is not valid UTF-8
+INVALID_NAMES = word(32) + word(1) + word(32) + word(1) + b'\xff' + bytes(31)
+# call selector -> (success, return data) of that call inside tryAggregate
+RESULTS = {
+    GET_PROTOCOL_NAMES.selector: (True, bytes.fromhex(encode_arguments([['string']], [['Aave', 'Curve']]))),
+    GET_PROTOCOL_ADAPTERS.selector: (False, b'reverted'),
+    GET_TOKEN_ADAPTER.selector: (True, b''),
+    GET_TOKEN_ADAPTER_NAMES.selector: (True, INVALID_NAMES),
+}
+CALLS = [
+    lambda sdk: sdk.protocol_names_call(),
+    lambda sdk: sdk.protocol_adapter_names_call('Aave'),
+    lambda sdk: sdk.token_adapter_call('ERC20'),
+    lambda sdk: sdk.token_adapter_names_call(),
+    lambda sdk: sdk.token_adapter_call('CToken'),
+]
+
+
+def read_calls(request):
+    data = request['params'][0]['data']
+    assert data.startswith(TRY_AGGREGATE.selector)
+    calldata = bytes.fromhex(data[10:])
+    return read_array(calldata, read_int(calldata, 32), read_call, dynamic_elements=True)
+
+
+def multicall_node(failing_post=None):
+    def handler(request):
+        calls = read_calls(request)
+        if len(transport.posts) == failing_post:
+            return error('boom')
+        results = [RESULTS['0x' + call.hex()[:8]] for _, call in calls]
+        return {'result': '0x' + encode_arguments([[('bool', 'bytes')]], [results])}
+    transport = ScriptedTransport(handler)
+    return transport
+
+
+def aggregate(transport, multicall_size=2):
+    async def run():
+        async with DeFiSDK(
+                'http://node', transport=transport, multicall_size=multicall_size, retry_policy=RetryPolicy(retries=0)
+        ) as sdk:
+            return await sdk.aggregate([call(sdk) for call in CALLS])
+    return asyncio.run(run())
+
+
+def test_results_and_errors_are_returned_in_place():
+    transport = multicall_node()
+    names, failed, empty, undecodable, last = aggregate(transport)
+    assert names == ['Aave', 'Curve']
+    assert isinstance(failed, MulticallCallFailed)
+    assert failed.body == '0x' + b'reverted'.hex()
+    assert isinstance(empty, EthereumNodeEmptyResponse)
+    assert isinstance(undecodable, UnicodeDecodeError)
+    assert isinstance(last, EthereumNodeEmptyResponse)
+    # five calls with a multicall size of two take three tryAggregate calls
+    assert [len(read_calls(request)) for request in transport.requests] == [2, 2, 1]
+
+
+def test_failed_chunk_fails_only_its_own_calls():
+    results = aggregate(multicall_node(failing_post=2))
+    assert [type(result) for result in results] == [
+        list, MulticallCallFailed, EthereumNodeResponseException, EthereumNodeResponseException,
+        EthereumNodeEmptyResponse
+    ]
+    assert results[2] is results[3]
@@ -0,0 +1,83 @@
+import asyncio
+import socket
+
+from defisdk import DeFiSDK, RecordingTransport, ReplayTransport, RetryPolicy
+from defisdk.abi import encode_arguments
+from defisdk.fake_node import FakeNode
+from defisdk.repositories.base import load_records
+from defisdk.repositories.defi import DeFiSDKAPIRepository, GET_PROTOCOL_NAMES, GET_TOKEN_ADAPTER_NAMES
+from defisdk.settings import DEFI_SDK_REGISTRY
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_owned_session_is_recreated_for_a_new_event_loop():
+    port = free_port()
+    repository = DeFiSDKAPIRepository(
+        f'http://127.0.0.1:{port}', DEFI_SDK_REGISTRY, retry_policy=RetryPolicy(retries=0)
+    )
+    sessions = []
+
+    async def run(close):
+        runner = await FakeNode(block_number=16).start(port=port)
+        try:
+            block_number = await repository.get_block_number()
+            sessions.append(repository.session)
+            if close:
+                await repository.aclose()
+            return block_number
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run(close=False)) == 16
+    assert asyncio.run(run(close=True)) == 16
+    assert sessions[0] is not sessions[1]
+    assert sessions[1].closed
+
+
+NAMES = '0x' + encode_arguments([['string']], [['Aave', 'Curve']])
+TOKEN_ADAPTER_NAMES = '0x' + encode_arguments([['string']], [['ERC20']])
+RECORDS = [
+    {
+        'request': {'method': 'eth_call', 'params': [{'to': DEFI_SDK_REGISTRY, 'data': call.selector}, '0x10']},
+        'response': {'result': result}
+    }
+    for call, result in [(GET_PROTOCOL_NAMES, NAMES), (GET_TOKEN_ADAPTER_NAMES, TOKEN_ADAPTER_NAMES)]
+]
+
+
+async def read_registry(sdk):
+    # one batched POST with both name lists, then a single request
+    async with sdk.batch():
+        names = await asyncio.gather(sdk.get_protocol_names(16), sdk.get_token_adapter_names(16))
+    return [*names, await sdk.get_protocol_names(16)]
+
+
+def test_recorded_traffic_replays_without_a_node(tmp_path):
+    path = str(tmp_path / 'traffic.jsonl')
+    port = free_port()
+    recorder = RecordingTransport(path)
+
+    async def record():
+        runner = await FakeNode(RECORDS).start(port=port)
+        try:
+            async with DeFiSDK(f'http://127.0.0.1:{port}', transport=recorder, coalesce=False) as sdk:
+                return await read_registry(sdk)
+        finally:
+            await runner.cleanup()
+
+    async def replay():
+        async with DeFiSDK('http://node', transport=ReplayTransport(path), coalesce=False) as sdk:
+            return await read_registry(sdk)
+
+    recorded = asyncio.run(record())
+    recorder.close()
+    assert recorded == [['Aave', 'Curve'], ['ERC20'], ['Aave', 'Curve']]
+    assert [record['request']['params'][0]['data'] for record in load_records(path)] == [
+        GET_PROTOCOL_NAMES.selector, GET_TOKEN_ADAPTER_NAMES.selector, GET_PROTOCOL_NAMES.selector
+    ]
+    assert asyncio.run(replay()) == recorded
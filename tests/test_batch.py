@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.abi import encode_arguments
+from defisdk.errors import EthereumNodeNoResponse, EthereumNodeResponseException
+from defisdk.repositories.defi import GET_PROTOCOL_NAMES, GET_TOKEN_ADAPTER_NAMES
+from tests.transport import ScriptedTransport, error
+
+NAMES = '0x' + encode_arguments([['string']], [['Aave', 'Curve']])
+
+
+def names_node(token_adapter_names):
+    def handler(request):
+        if request['params'][0]['data'] == GET_PROTOCOL_NAMES.selector:
+            return {'result': NAMES}
+        assert request['params'][0]['data'] == GET_TOKEN_ADAPTER_NAMES.selector
+        return token_adapter_names
+    return ScriptedTransport(handler)
+
+
+def gather_names(transport, scoped=True, **kwargs):
+    async def run():
+        async with DeFiSDK('http://node', transport=transport, retry_policy=RetryPolicy(retries=0), **kwargs) as sdk:
+            if not scoped:
+                return await gather(sdk)
+            async with sdk.batch():
+                return await gather(sdk)
+
+    async def gather(sdk):
+        return await asyncio.gather(
+            sdk.get_protocol_names(), sdk.get_token_adapter_names(), return_exceptions=True
+        )
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('scoped, kwargs', [(True, {}), (False, {'batch_window': 0.01})])
+def test_calls_share_one_batch(scoped, kwargs):
+    transport = names_node({'result': NAMES})
+    assert gather_names(transport, scoped, **kwargs) == [['Aave', 'Curve']] * 2
+    assert len(transport.posts) == 1
+    assert len(transport.posts[0]) == 2
+
+
+def test_batch_items_fail_on_their_own():
+    transport = names_node(error('header not found'))
+    protocol_names, token_adapter_names = gather_names(transport)
+    assert protocol_names == ['Aave', 'Curve']
+    assert isinstance(token_adapter_names, EthereumNodeResponseException)
+    assert len(transport.posts) == 1
+
+
+def test_missing_batch_answer_fails_its_call_only():
+    class DroppingTransport(ScriptedTransport):
+        async def post(self, send, url, headers, data):
+            return (await super().post(send, url, headers, data))[:1]
+
+    transport = DroppingTransport(names_node({'result': NAMES}).handler)
+    protocol_names, token_adapter_names = gather_names(transport)
+    assert protocol_names == ['Aave', 'Curve']
+    assert isinstance(token_adapter_names, EthereumNodeNoResponse)
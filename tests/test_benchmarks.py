@@ -0,0 +1,18 @@
+import asyncio
+
+import pytest
+
+from benchmarks.suite import measure
+
+
+@pytest.mark.parametrize('number, concurrency', [(2, 4), (5, 2), (4, 1)])
+def test_measure_runs_every_call(number, concurrency):
+    calls = []
+
+    async def call():
+        calls.append(None)
+
+    result = asyncio.run(measure(call, number, concurrency))
+    # one more untimed call measures peak memory
+    assert len(calls) == number + 1
+    assert result['p99_ms'] >= result['p50_ms']
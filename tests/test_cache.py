@@ -0,0 +1,60 @@
+import sqlite3
+
+from defisdk.cache import LRUCache, SQLiteCache
+
+
+def count_rows(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    assert cache.get('a') == '1'
+    cache.set('c', '3')
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == ('1', '3')
+
+
+def test_lru_cache_bounds_bytes():
+    cache = LRUCache(max_bytes=8)
+    cache.set('a', '1234')
+    cache.set('b', '1234')
+    assert cache.get('a') is None
+    assert cache.size_bytes == 5
+
+
+def test_expired_entries_are_dropped():
+    cache = LRUCache()
+    cache.set('a', '1', ttl=0)
+    assert cache.get('a') is None
+
+
+def test_sqlite_cache_commits_in_batches(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = SQLiteCache(path, commit_interval=3600, commit_size=3)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    assert cache.get('a') == '1'
+    assert count_rows(path) == 0
+    cache.set('c', '3')
+    assert count_rows(path) == 3
+    cache.set('d', '4')
+    cache.close()
+    assert count_rows(path) == 4
+
+
+def test_sqlite_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = SQLiteCache(path)
+    cache.set('a', '1')
+    cache.set('b', '2', ttl=-1)
+    cache.close()
+    cache = SQLiteCache(path)
+    assert (cache.get('a'), cache.get('b')) == ('1', None)
+    cache.close()
@@ -0,0 +1,59 @@
+import asyncio
+
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.abi import encode_arguments
+from defisdk.errors import EthereumNodeResponseException
+from tests.transport import ScriptedTransport, error
+
+NAMES = '0x' + encode_arguments([['string']], [['Aave', 'Curve']])
+
+
+def run_sdk(transport, scenario):
+    async def run():
+        async with DeFiSDK('http://node', transport=transport, retry_policy=RetryPolicy(retries=0)) as sdk:
+            return await scenario(sdk)
+    return asyncio.run(run())
+
+
+def test_identical_calls_share_one_request_and_get_their_own_lists():
+    transport = ScriptedTransport(lambda request: {'result': NAMES}, delay=0.05)
+
+    async def scenario(sdk):
+        return await asyncio.gather(*(sdk.get_protocol_names() for _ in range(3)))
+
+    results = run_sdk(transport, scenario)
+    assert len(transport.posts) == 1
+    assert results == [['Aave', 'Curve']] * 3
+    results[0].append('Compound')
+    assert results[1] == results[2] == ['Aave', 'Curve']
+    assert results[1] is not results[2]
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    transport = ScriptedTransport(lambda request: {'result': NAMES}, delay=0.05)
+
+    async def scenario(sdk):
+        cancelled = asyncio.ensure_future(sdk.get_protocol_names())
+        waiting = asyncio.ensure_future(sdk.get_protocol_names())
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        return await waiting, await asyncio.gather(cancelled, return_exceptions=True)
+
+    names, (cancelled,) = run_sdk(transport, scenario)
+    assert names == ['Aave', 'Curve']
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert len(transport.posts) == 1
+
+
+def test_error_reaches_every_waiter_and_is_not_remembered():
+    answers = iter([error('boom'), {'result': NAMES}])
+    transport = ScriptedTransport(lambda request: next(answers), delay=0.05)
+
+    async def scenario(sdk):
+        errors = await asyncio.gather(sdk.get_protocol_names(), sdk.get_protocol_names(), return_exceptions=True)
+        return errors, await sdk.get_protocol_names()
+
+    errors, names = run_sdk(transport, scenario)
+    assert all(isinstance(e, EthereumNodeResponseException) for e in errors)
+    assert names == ['Aave', 'Curve']
+    assert len(transport.posts) == 2
@@ -0,0 +1,39 @@
+import csv
+
+import pytest
+
+from benchmarks.fixtures import protocol_balances_response
+from defisdk.columnar import COLUMNS, PortfolioColumns
+from defisdk.entities import RawBalance
+from defisdk.serializers import defi_sdk_protocol_balances_to_entity
+
+ACCOUNT = '0x' + '11' * 20
+
+
+@pytest.mark.parametrize('protocols, adapters, assets, seed', [(0, 0, 0, 0), (1, 1, 1, 1), (5, 2, 4, 2), (3, 4, 8, 3)])
+def test_response_walk_matches_the_entity_tree(tmp_path, protocols, adapters, assets, seed):
+    response = protocol_balances_response(protocols, adapters, assets, seed)
+    from_response, from_entities = PortfolioColumns(), PortfolioColumns()
+    from_response.extend_from_response(ACCOUNT, response, 16)
+    from_entities.extend_from_entities(ACCOUNT, defi_sdk_protocol_balances_to_entity(response), 16)
+
+    assert from_response.to_dict() == from_entities.to_dict()
+    assert len(from_response) >= protocols * adapters * assets
+
+    from_response.to_csv(str(tmp_path / 'response.csv'))
+    from_entities.to_csv(str(tmp_path / 'entities.csv'))
+    with open(tmp_path / 'response.csv', newline='') as f:
+        rows = list(csv.reader(f))
+    assert (tmp_path / 'response.csv').read_text() == (tmp_path / 'entities.csv').read_text()
+    assert rows[0] == list(COLUMNS)
+    assert len(rows) == len(from_response) + 1
+    # uint256 amounts are written exactly
+    assert [int(row[COLUMNS.index('raw_amount')]) for row in rows[1:]] == from_response.raw_amount
+
+
+def test_raw_balances_give_the_same_columns():
+    response = protocol_balances_response(3, seed=4)
+    from_response, from_entities = PortfolioColumns(), PortfolioColumns()
+    from_response.extend_from_response(ACCOUNT, response)
+    from_entities.extend_from_entities(ACCOUNT, defi_sdk_protocol_balances_to_entity(response, RawBalance))
+    assert from_response.to_dict() == from_entities.to_dict()
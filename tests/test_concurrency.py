@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+from defisdk.concurrency import bounded_map
+
+
+async def collect(concurrency, ordered=False):
+    async def double(item):
+        await asyncio.sleep(0.01 * (3 - item))
+        return item * 2
+    return [result async for result in bounded_map(double, range(3), concurrency, ordered=ordered)]
+
+
+@pytest.mark.parametrize('concurrency', [0, -1])
+def test_concurrency_below_one_is_rejected(concurrency):
+    with pytest.raises(ValueError):
+        asyncio.run(collect(concurrency))
+
+
+def test_ordered_results_follow_the_items():
+    assert asyncio.run(collect(3, ordered=True)) == [(0, 0), (1, 2), (2, 4)]
+    assert asyncio.run(collect(3)) == [(2, 4), (1, 2), (0, 0)]
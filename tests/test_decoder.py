@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from benchmarks.fixtures import FULL_TOKEN_BALANCE, PROTOCOL_BALANCE
+from defisdk.abi import encode_arguments
+from defisdk.entities import RawBalance
+from defisdk.serializers import (
+    defi_sdk_full_token_balance_to_entity,
+    defi_sdk_protocol_balances_to_entity,
+    defi_sdk_protocol_names_to_list_of_string,
+    multicall_results_to_list
+)
+
+TOKEN = '0x' + 'ab' * 20
+UNDERLYING = '0x' + 'cd' * 20
+ADAPTER = '0x' + 'ef' * 20
+
+TOKEN_BALANCE = ((TOKEN, 'Token', 'TKN', 18), 15 * 10 ** 17)
+UNDERLYING_BALANCE = ((UNDERLYING, 'Ünderlying', 'UND', 6), 2500000)
+PROTOCOL = (
+    ('Protocol', 'Description longer than one thirty-two byte word', 'protocol.fi', 'icon.png', 2),
+    [((ADAPTER, 'Asset'), [(TOKEN_BALANCE, [UNDERLYING_BALANCE])])]
+)
+
+
+def test_protocol_balances():
+    data = '0x' + encode_arguments([[PROTOCOL_BALANCE]], [[PROTOCOL, PROTOCOL]])
+    balances = defi_sdk_protocol_balances_to_entity(data)
+    assert len(balances) == 2
+    balance = balances[0]
+    assert balance.metadata.name == 'Protocol'
+    assert balance.metadata.description == 'Description longer than one thirty-two byte word'
+    assert balance.metadata.version == 2
+    adapter = balance.adapter_balances[0]
+    assert (adapter.metadata.address, adapter.metadata.type) == (ADAPTER, 'Asset')
+    asset = adapter.asset_balances[0]
+    assert asset.base_token_balance.metadata.symbol == 'TKN'
+    assert asset.base_token_balance.balance == Decimal('1.5')
+    assert asset.underlying_token_balances[0].metadata.name == 'Ünderlying'
+    assert asset.underlying_token_balances[0].balance == Decimal('2.5')
+    # metadata is interned across entities
+    assert balances[1].metadata is balance.metadata
+
+
+def test_protocol_balances_raw_and_lazy():
+    data = '0x' + encode_arguments([[PROTOCOL_BALANCE]], [[PROTOCOL]])
+    raw = defi_sdk_protocol_balances_to_entity(data, RawBalance)
+    assert raw[0].adapter_balances[0].asset_balances[0].base_token_balance.balance == RawBalance(15 * 10 ** 17, 18)
+    assert defi_sdk_protocol_balances_to_entity(data, RawBalance, lazy=True) == raw
+
+
+def test_empty_response():
+    assert defi_sdk_protocol_balances_to_entity('0x') == []
+
+
+def test_strings():
+    data = '0x' + encode_arguments([['string']], [['Aave', 'Curve', '']])
+    assert defi_sdk_protocol_names_to_list_of_string(data) == ['Aave', 'Curve', '']
+
+
+def test_full_token_balance_is_a_rate():
+    # underlying amounts are per 10 ** 18 base units, whatever the base token decimals
+    base = ((TOKEN, 'Token', 'TKN', 8), 10 ** 8)
+    data = '0x' + encode_arguments([FULL_TOKEN_BALANCE], [(base, [UNDERLYING_BALANCE])])
+    balance = defi_sdk_full_token_balance_to_entity(data)
+    assert balance.base_token_balance.balance == Decimal(1)
+    assert balance.underlying_token_balances[0].balance == Decimal('2.5E-10')
+
+
+def test_multicall_results():
+    data = '0x' + encode_arguments([[('bool', 'bytes')]], [[(True, b'\x01'), (False, b'')]])
+    assert multicall_results_to_list(data) == [(True, '0x01'), (False, '0x')]
@@ -0,0 +1,75 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.errors import EthereumNodeRateLimited
+from defisdk.fake_node import NOT_RECORDED_ERROR, RATE_LIMIT_ERROR, FakeNode
+from tests.test_base import NAMES, RECORDS, free_port
+
+
+def serve(node, scenario):
+    async def run():
+        port = free_port()
+        runner = await node.start(port=port)
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await scenario(session, f'http://127.0.0.1:{port}')
+        finally:
+            await runner.cleanup()
+    return asyncio.run(run())
+
+
+def call(block, request_id=1, data=RECORDS[0]['request']['params'][0]['data']):
+    params = [{**RECORDS[0]['request']['params'][0], 'data': data}, block]
+    return {'jsonrpc': '2.0', 'id': request_id, 'method': 'eth_call', 'params': params}
+
+
+async def post(session, url, data):
+    async with session.post(url, json=data) as r:
+        return r.status, await r.json()
+
+
+def test_batch_is_answered_per_request():
+    async def scenario(session, url):
+        return await post(session, url, [
+            {'jsonrpc': '2.0', 'id': 7, 'method': 'eth_blockNumber', 'params': []},
+            call('0x10', request_id=8),
+            call('0x10', request_id=9, data='0x12345678'),
+        ])
+
+    status, answers = serve(FakeNode(RECORDS, block_number=16), scenario)
+    assert status == 200
+    assert answers == [
+        {'jsonrpc': '2.0', 'id': 7, 'result': '0x10'},
+        {'jsonrpc': '2.0', 'id': 8, 'result': NAMES},
+        {'jsonrpc': '2.0', 'id': 9, 'error': NOT_RECORDED_ERROR},
+    ]
+
+
+def test_call_recorded_at_one_block_answers_any_block():
+    async def scenario(session, url):
+        return [await post(session, url, call(block)) for block in ('0x10', '0x20', 'latest')]
+
+    answers = serve(FakeNode(RECORDS), scenario)
+    assert [answer.get('result') for _, answer in answers] == [NAMES] * 3
+
+
+def test_rate_limit_answers_429_with_a_rate_limit_error():
+    async def scenario(session, url):
+        return [await post(session, url, call('0x10')) for _ in range(2)]
+
+    (first_status, first), (second_status, second) = serve(FakeNode(RECORDS, rate_limit=1), scenario)
+    assert (first_status, first['result']) == (200, NAMES)
+    assert (second_status, second['error']) == (429, RATE_LIMIT_ERROR)
+
+
+def test_sdk_reports_the_fake_node_rate_limit():
+    async def scenario(session, url):
+        async with DeFiSDK(url, retry_policy=RetryPolicy(retries=0)) as sdk:
+            await sdk.get_protocol_names(16)
+            return await sdk.get_protocol_names(16)
+
+    with pytest.raises(EthereumNodeRateLimited):
+        serve(FakeNode(RECORDS, rate_limit=1), scenario)
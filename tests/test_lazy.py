@@ -0,0 +1,44 @@
+import dataclasses
+import pickle
+
+from benchmarks.fixtures import protocol_balances_response
+from defisdk.entities import AdapterBalance, ProtocolBalance
+from defisdk.lazy import LazyAdapterBalance, LazyProtocolBalance
+from defisdk.serializers import defi_sdk_protocol_balances_to_entity
+
+DATA = protocol_balances_response(3)
+
+
+def test_lazy_balances_equal_eager_balances():
+    eager = defi_sdk_protocol_balances_to_entity(DATA)
+    lazy = defi_sdk_protocol_balances_to_entity(DATA, lazy=True)
+    assert all(type(balance) is LazyProtocolBalance for balance in lazy)
+    assert all(isinstance(balance, ProtocolBalance) for balance in lazy)
+    assert lazy == eager
+    assert eager == lazy
+    assert {*lazy} == {*eager}
+    assert isinstance(lazy[0].adapter_balances[0], LazyAdapterBalance)
+
+
+def test_lazy_balances_decode_once():
+    balance = defi_sdk_protocol_balances_to_entity(DATA, lazy=True)[0]
+    assert balance.adapter_balances is balance.adapter_balances
+    assert balance.adapter_balances[0].asset_balances is balance.adapter_balances[0].asset_balances
+
+
+def test_lazy_balances_pickle_as_eager_balances():
+    lazy = defi_sdk_protocol_balances_to_entity(DATA, lazy=True)
+    restored = pickle.loads(pickle.dumps(lazy))
+    assert type(restored[0]) is ProtocolBalance
+    assert type(restored[0].adapter_balances[0]) is AdapterBalance
+    assert restored == lazy
+
+
+def test_replace_builds_eager_entities():
+    balance = defi_sdk_protocol_balances_to_entity(DATA, lazy=True)[0]
+    replaced = dataclasses.replace(balance, adapter_balances=())
+    assert type(replaced) is ProtocolBalance
+    assert replaced == ProtocolBalance(balance.metadata, ())
+    adapter = dataclasses.replace(balance.adapter_balances[0], asset_balances=())
+    assert type(adapter) is AdapterBalance
+    assert adapter.metadata is balance.adapter_balances[0].metadata
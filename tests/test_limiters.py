@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from defisdk.enums import NodeErrorType
+from defisdk.limiters import AdaptiveConcurrencyLimiter, RateLimiter, TokenBucket
+
+
+def test_cost_above_capacity_is_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter(compute_units_per_second=20, method_costs={'eth_call': 26})
+    with pytest.raises(ValueError):
+        RateLimiter(requests_per_second=0.5)
+    with pytest.raises(ValueError):
+        asyncio.run(TokenBucket(10).acquire(11))
+
+
+def test_bucket_built_outside_a_loop_works_in_several_loops():
+    bucket = TokenBucket(1000, 10)
+    for _ in range(2):
+        asyncio.run(asyncio.wait_for(bucket.acquire(5), 1))
+
+
+def test_acquire_waits_for_refill():
+    bucket = TokenBucket(100, 10)
+
+    async def run():
+        await bucket.acquire(10)
+        start = asyncio.get_running_loop().time()
+        await bucket.acquire(5)
+        return asyncio.get_running_loop().time() - start
+
+    assert 0.03 < asyncio.run(run()) < 0.5
+
+
+def test_try_acquire():
+    bucket = TokenBucket(1, 2)
+    assert bucket.try_acquire(2)
+    assert not bucket.try_acquire(1)
+
+
+def test_rate_limiter_charges_method_costs():
+    limiter = RateLimiter(compute_units_per_second=30, method_costs={'eth_call': 26})
+
+    async def run():
+        await limiter.acquire('eth_call')
+        return limiter._compute_units.tokens
+
+    assert asyncio.run(run()) < 5
+
+
+def test_concurrency_limit_halves_on_rate_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=8)
+
+    async def run():
+        await limiter.acquire()
+        limiter.release(error=NodeErrorType.RateLimit)
+
+    asyncio.run(run())
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
@@ -0,0 +1,186 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.abi import encode_arguments
+from defisdk.errors import EthereumNodeNoResponse, EthereumNodeRateLimited
+from defisdk.repositories.nodes import NodeEndpoint, NodePool
+from tests.transport import NodesTransport, ScriptedTransport, error
+
+NAMES = '0x' + encode_arguments([['string']], [['Aave']])
+
+
+def endpoint(url, latency=None, samples=20):
+    node = NodeEndpoint(url)
+    for _ in range(samples if latency is not None else 0):
+        node.record_success(latency)
+    return node
+
+
+def test_failing_node_is_ranked_behind_slow_healthy_node():
+    pool = NodePool(['http://dead', 'http://slow'], exploration=0)
+    calls = []
+
+    async def send(node):
+        calls.append(node.url)
+        if node.url == 'http://dead':
+            raise aiohttp.ClientConnectionError()
+        await asyncio.sleep(0.02)
+        return node.url
+
+    async def run():
+        return [await pool.request(send) for _ in range(10)]
+
+    assert asyncio.run(run()) == ['http://slow'] * 10
+    assert calls.count('http://dead') == 1
+    assert pool.ranked()[0].url == 'http://slow'
+
+
+def test_failover_raises_last_error_when_every_node_fails():
+    pool = NodePool(['http://a', 'http://b'], exploration=0)
+    calls = []
+
+    async def send(node):
+        calls.append(node.url)
+        raise EthereumNodeNoResponse()
+
+    with pytest.raises(EthereumNodeNoResponse):
+        asyncio.run(pool.request(send))
+    assert sorted(calls) == ['http://a', 'http://b']
+
+
+def test_non_transport_errors_are_not_failed_over():
+    pool = NodePool(['http://a', 'http://b'], exploration=0)
+    calls = []
+
+    async def send(node):
+        calls.append(node.url)
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        asyncio.run(pool.request(send))
+    assert len(calls) == 1
+
+
+def test_slow_request_is_hedged_to_the_next_node():
+    primary = endpoint('http://primary', 0.01)
+    pool = NodePool([primary, endpoint('http://secondary', 0.02)], hedge_percentile=50, exploration=0)
+
+    async def send(node):
+        await asyncio.sleep(1 if node is primary else 0)
+        return node.url
+
+    async def run():
+        start = asyncio.get_running_loop().time()
+        result = await pool.request(send)
+        return result, asyncio.get_running_loop().time() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == 'http://secondary'
+    assert elapsed < 0.5
+
+
+def test_failed_hedged_pair_is_not_retried():
+    primary = endpoint('http://a', 0.01)
+    pool = NodePool(
+        [primary, endpoint('http://b', 0.02), endpoint('http://c', 0.02)], hedge_percentile=50, exploration=0
+    )
+    calls = []
+
+    async def send(node):
+        calls.append(node.url)
+        if node is primary:
+            await asyncio.sleep(0.05)
+        if node.url != 'http://c':
+            raise EthereumNodeNoResponse()
+        return node.url
+
+    assert asyncio.run(pool.request(send)) == 'http://c'
+    assert calls == ['http://a', 'http://b', 'http://c']
+
+
+def test_rate_limited_node_is_failed_over_and_ranked_last():
+    limited, healthy = NodeEndpoint('http://limited'), NodeEndpoint('http://healthy')
+    limited_transport = ScriptedTransport(lambda request: error('daily request count exceeded', -32005))
+    healthy_transport = ScriptedTransport(lambda request: {'result': NAMES})
+    transport = NodesTransport({'http://limited': limited_transport, 'http://healthy': healthy_transport})
+
+    async def run():
+        async with DeFiSDK([limited, healthy], transport=transport, retry_policy=RetryPolicy(retries=0)) as sdk:
+            return [await sdk.get_protocol_names() for _ in range(5)]
+
+    assert asyncio.run(run()) == [['Aave']] * 5
+    assert limited.errors == len(limited_transport.posts) >= 1
+    assert healthy.errors == 0
+    assert [endpoint.url for endpoint in sorted([limited, healthy], key=lambda e: e.score)] == [
+        'http://healthy', 'http://limited'
+    ]
+
+
+def test_rate_limit_is_raised_once_every_node_is_limited():
+    transport = ScriptedTransport(lambda request: error('too many requests', 429))
+
+    async def run():
+        async with DeFiSDK(['http://a', 'http://b'], transport=transport, retry_policy=RetryPolicy(retries=0)) as sdk:
+            return await sdk.get_protocol_names()
+
+    with pytest.raises(EthereumNodeRateLimited):
+        asyncio.run(run())
+    assert len(transport.posts) == 2
+
+
+def test_recently_failed_node_is_not_explored():
+    failed = endpoint('http://failed', 0.05)
+    failed.record_failure()
+    pool = NodePool([endpoint('http://best', 0.01), failed], exploration=1)
+    assert {pool.ranked()[0].url for _ in range(20)} == {'http://best'}
+
+    pool = NodePool([endpoint('http://best', 0.01), failed], exploration=1, exploration_cooldown=0)
+    assert pool.ranked()[0].url == 'http://failed'
+
+
+def test_explored_node_is_hedged_to_the_best_node():
+    hung = endpoint('http://hung', 0.05)
+    pool = NodePool([endpoint('http://best', 0.01), hung], exploration=1)
+
+    async def send(node):
+        await asyncio.sleep(1 if node is hung else 0)
+        return node.url
+
+    async def run():
+        start = asyncio.get_running_loop().time()
+        result = await pool.request(send)
+        return result, asyncio.get_running_loop().time() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == 'http://best'
+    assert elapsed < 0.5
+
+
+def test_hedged_call_reports_only_the_winning_leg():
+    primary, secondary = endpoint('http://primary', 0.01), endpoint('http://secondary', 0.02)
+    transport = NodesTransport({
+        'http://primary': ScriptedTransport(lambda request: {'result': NAMES}, delay=0.3),
+        'http://secondary': ScriptedTransport(lambda request: {'result': NAMES})
+    })
+    metrics = []
+
+    async def run():
+        async with DeFiSDK(
+                [primary, secondary],
+                hedge_percentile=50,
+                transport=transport,
+                retry_policy=RetryPolicy(retries=0),
+                hooks=[metrics.append]
+        ) as sdk:
+            names = await sdk.get_protocol_names()
+            # let the cancelled leg unwind before looking at the metrics
+            await asyncio.sleep(0.05)
+            return names
+
+    assert asyncio.run(run()) == ['Aave']
+    assert len(metrics) == 1
+    assert metrics[0].node == 'http://secondary'
+    assert metrics[0].network_seconds < 0.2
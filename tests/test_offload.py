@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixtures import protocol_balances_response
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.abi import encode_arguments
+from defisdk.repositories.defi import GET_BALANCES, GET_PROTOCOL_NAMES, GET_TOKEN_ADAPTER_NAMES, TRY_AGGREGATE
+from defisdk.repositories.ethereum import raw_result
+from defisdk.serializers import multicall_results_to_list
+from tests.test_aggregate import read_calls
+from tests.transport import ScriptedTransport
+
+ACCOUNT = '0x' + '11' * 20
+NAMES = {
+    GET_PROTOCOL_NAMES.selector: encode_arguments([['string']], [['Aave', 'Curve']]),
+    GET_TOKEN_ADAPTER_NAMES.selector: encode_arguments([['string']], [['ERC20']]),
+}
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.functions = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.functions.append(fn)
+        return super().submit(fn, *args, **kwargs)
+
+
+def handler(request):
+    if request['method'] == 'eth_blockNumber':
+        return {'result': '0x10'}
+    data = request['params'][0]['data']
+    if data.startswith(GET_BALANCES.selector):
+        return {'result': protocol_balances_response(3)}
+    assert data.startswith(TRY_AGGREGATE.selector)
+    results = [(True, bytes.fromhex(NAMES['0x' + call.hex()[:8]])) for _, call in read_calls(request)]
+    return {'result': '0x' + encode_arguments([[('bool', 'bytes')]], [results])}
+
+
+def query(**kwargs):
+    async def run():
+        async with DeFiSDK(
+                'http://node', transport=ScriptedTransport(handler), retry_policy=RetryPolicy(retries=0), **kwargs
+        ) as sdk:
+            return (
+                await sdk.get_account_balance(ACCOUNT),
+                await sdk.aggregate([sdk.protocol_names_call(), sdk.token_adapter_names_call()]),
+                (await sdk.get_account_balances_columns([ACCOUNT])).to_dict()
+            )
+    return asyncio.run(run())
+
+
+def test_offloaded_decoding_matches_inline_decoding():
+    executor = RecordingExecutor()
+    try:
+        offloaded = query(decode_executor=executor, decode_offload_threshold=1)
+    finally:
+        executor.shutdown()
+    assert offloaded == query()
+    assert offloaded[1] == [['Aave', 'Curve'], ['ERC20']]
+    # the balances and both name lists are decoded on the executor
+    assert len(executor.functions) == 3
+    assert raw_result not in executor.functions
+    assert multicall_results_to_list not in executor.functions
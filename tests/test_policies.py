@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.enums import NodeErrorType
+from defisdk.errors import (
+    EthereumNodeExecutionReverted,
+    EthereumNodeLimitExceeded,
+    EthereumNodeNoResponse,
+    EthereumNodeRateLimited,
+    EthereumNodeResponseException,
+    EthereumNodeTimeout,
+    EthereumNodeTransportError
+)
+from defisdk.policies import classify_error
+from tests.transport import ScriptedTransport, error
+
+
+@pytest.mark.parametrize('exception, error_type', [
+    (EthereumNodeRateLimited(None, 'rate limit', -32005, None), NodeErrorType.RateLimit),
+    (aiohttp.ClientResponseError(None, (), status=429), NodeErrorType.RateLimit),
+    (EthereumNodeExecutionReverted(None, 'execution reverted', 3, None), NodeErrorType.Execution),
+    (EthereumNodeLimitExceeded(None, 'response size exceeded', -32000, None), NodeErrorType.Limit),
+    (EthereumNodeTimeout(), NodeErrorType.Timeout),
+    (asyncio.TimeoutError(), NodeErrorType.Timeout),
+    (EthereumNodeTransportError('502: Bad Gateway'), NodeErrorType.Transport),
+    (EthereumNodeNoResponse(), NodeErrorType.Transport),
+    (aiohttp.ClientConnectionError(), NodeErrorType.Transport),
+    (EthereumNodeResponseException(None, 'header not found', -32000, None), NodeErrorType.Unknown),
+    (ValueError(), NodeErrorType.Unknown),
+])
+def test_classify_error(exception, error_type):
+    assert classify_error(exception) == error_type
+
+
+def test_backoff_doubles_up_to_the_maximum():
+    policy = RetryPolicy(backoff_base=0.1, backoff_max=0.5, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+    assert 0 <= RetryPolicy(backoff_base=0.1).backoff(2) <= 0.4
+
+
+def script(*answers):
+    # answers the n-th request with answers[n] (the last one repeats), exceptions are raised by the transport
+    answers = list(answers)
+
+    def handler(request):
+        answer = answers.pop(0) if len(answers) > 1 else answers[0]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+    return handler
+
+
+def block_number(transport, policy):
+    async def run():
+        async with DeFiSDK('http://node', transport=transport, retry_policy=policy) as sdk:
+            return await sdk._repository.get_block_number()
+    return asyncio.run(run())
+
+
+def test_transport_errors_are_retried():
+    transport = ScriptedTransport(script(aiohttp.ClientConnectionError(), error('rate limit', 429), {'result': '0x10'}))
+    assert block_number(transport, RetryPolicy(retries=2, backoff_base=0.001)) == 16
+    assert len(transport.posts) == 3
+
+
+def test_transport_error_surfaces_when_retries_run_out():
+    transport = ScriptedTransport(script(aiohttp.ClientConnectionError('refused')))
+    with pytest.raises(EthereumNodeTransportError):
+        block_number(transport, RetryPolicy(retries=1, backoff_base=0.001))
+    assert len(transport.posts) == 2
+
+
+def test_http_429_is_a_rate_limit():
+    transport = ScriptedTransport(script(aiohttp.ClientResponseError(None, (), status=429, message='Too Many')))
+    with pytest.raises(EthereumNodeRateLimited):
+        block_number(transport, RetryPolicy(retries=0))
+
+
+def test_execution_errors_are_not_retried():
+    transport = ScriptedTransport(script(error('execution reverted', 3)))
+    with pytest.raises(EthereumNodeExecutionReverted):
+        block_number(transport, RetryPolicy(retries=3, backoff_base=0.001))
+    assert len(transport.posts) == 1
+
+
+def test_deadline_bounds_all_attempts():
+    transport = ScriptedTransport(script({'result': '0x10'}), delay=1)
+    start = time.monotonic()
+    with pytest.raises(EthereumNodeTimeout):
+        block_number(transport, RetryPolicy(deadline=0.1))
+    assert time.monotonic() - start < 0.5
+
+
+def test_per_attempt_timeout_is_retried():
+    transport = ScriptedTransport(script({'result': '0x10'}), delay=0.2)
+    with pytest.raises(EthereumNodeTimeout):
+        block_number(transport, RetryPolicy(timeout=0.05, retries=1, backoff_base=0.001))
+    assert len(transport.posts) == 2
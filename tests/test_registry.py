@@ -0,0 +1,72 @@
+import asyncio
+
+from defisdk import DeFiSDK
+from defisdk.abi import encode_arguments
+from defisdk.decoder import read_address, read_array, read_bytes, read_int
+from defisdk.repositories.defi import (
+    GET_PROTOCOL_ADAPTERS,
+    GET_PROTOCOL_NAMES,
+    GET_TOKEN_ADAPTER,
+    GET_TOKEN_ADAPTER_NAMES,
+    TRY_AGGREGATE
+)
+from tests.transport import ScriptedTransport, error
+
+ADAPTER = '0x' + 'ab' * 20
+ANSWERS = {
+    GET_PROTOCOL_NAMES.selector: encode_arguments([['string']], [['Aave', 'Curve']]),
+    GET_TOKEN_ADAPTER_NAMES.selector: encode_arguments([['string']], [['ERC20']]),
+    GET_PROTOCOL_ADAPTERS.selector: encode_arguments([['address']], [[ADAPTER]]),
+    GET_TOKEN_ADAPTER.selector: encode_arguments(['address'], [ADAPTER]),
+}
+
+
+def read_call(data: bytes, offset: int):
+    return read_address(data, offset), read_bytes(data, offset + read_int(data, offset + 32))
+
+
+def registry_node(multicall=True):
+    def handler(request):
+        if request['method'] == 'eth_blockNumber':
+            return {'result': '0x10'}
+        data = request['params'][0]['data']
+        if data.startswith(TRY_AGGREGATE.selector):
+            if not multicall:
+                return error('execution reverted', 3)
+            calldata = bytes.fromhex(data[10:])
+            calls = read_array(calldata, read_int(calldata, 32), read_call, dynamic_elements=True)
+            results = [(True, bytes.fromhex(ANSWERS['0x' + call.hex()[:8]])) for _, call in calls]
+            return {'result': '0x' + encode_arguments([[('bool', 'bytes')]], [results])}
+        return {'result': '0x' + ANSWERS[data[:10]]}
+    return ScriptedTransport(handler)
+
+
+def test_warm_registry_takes_two_round_trips():
+    transport = registry_node()
+
+    async def run():
+        async with DeFiSDK('http://node', transport=transport) as sdk:
+            return await sdk.warm_registry()
+
+    snapshot = asyncio.run(run())
+    assert snapshot.block == 16
+    assert snapshot.protocol_adapter_names == {'Aave': [ADAPTER], 'Curve': [ADAPTER]}
+    assert snapshot.token_adapters == {'ERC20': ADAPTER}
+    posts = [post if isinstance(post, list) else [post] for post in transport.posts]
+    methods = [[request['method'] for request in post] for post in posts]
+    assert methods == [['eth_blockNumber', 'eth_call'], ['eth_call']]
+
+
+def test_failed_warm_up_is_not_repeated_on_every_lookup():
+    transport = registry_node(multicall=False)
+
+    async def run():
+        async with DeFiSDK('http://node', transport=transport, registry_cache_ttl=3600) as sdk:
+            return [await sdk.get_protocol_names() for _ in range(3)]
+
+    assert asyncio.run(run()) == [['Aave', 'Curve']] * 3
+    multicalls = [
+        request for request in transport.requests
+        if request['method'] == 'eth_call' and request['params'][0]['data'].startswith(TRY_AGGREGATE.selector)
+    ]
+    assert len(multicalls) == 1
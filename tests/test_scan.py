@@ -0,0 +1,80 @@
+import asyncio
+
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.cache import LRUCache, SQLiteCache
+from defisdk.errors import EthereumNodeResponseException
+from defisdk.repositories.defi import GET_BALANCES
+from tests.test_split import protocol_balances
+from tests.transport import ScriptedTransport, error
+
+ACCOUNT = '0x' + '11' * 20
+
+
+class BlocksNode(ScriptedTransport):
+    # every block answers with one protocol named after it, later blocks answer faster
+
+    def __init__(self, failing=()):
+        super().__init__(self.answer)
+        self.failing = set(failing)
+
+    @staticmethod
+    def block(request):
+        return int(request['params'][1], 16)
+
+    def answer(self, request):
+        assert request['params'][0]['data'].startswith(GET_BALANCES.selector)
+        if self.block(request) in self.failing:
+            return error('header not found')
+        return {'result': protocol_balances([f'Block {self.block(request)}'])}
+
+    async def post(self, send, url, headers, data):
+        await asyncio.sleep(0.005 * (10 - self.block(data)))
+        return await super().post(send, url, headers, data)
+
+    @property
+    def blocks(self):
+        return sorted(self.block(request) for request in self.requests)
+
+
+def scan(transport, checkpoint=None, stop_after=None, concurrency=4):
+    async def run():
+        async with DeFiSDK('http://node', transport=transport, retry_policy=RetryPolicy(retries=0)) as sdk:
+            results = []
+            async for block, balances in sdk.scan_account_balances(
+                    ACCOUNT, 1, 6, concurrency=concurrency, checkpoint=checkpoint
+            ):
+                results.append((block, balances))
+                if len(results) == stop_after:
+                    break
+            return results
+    return asyncio.run(run())
+
+
+def test_results_come_out_in_block_order():
+    results = scan(BlocksNode())
+    assert [block for block, _ in results] == [1, 2, 3, 4, 5, 6]
+    assert [balances[0].metadata.name for _, balances in results] == [f'Block {block}' for block in range(1, 7)]
+
+
+def test_checkpoint_stops_at_the_first_failed_block():
+    checkpoint = LRUCache()
+    results = scan(BlocksNode(failing=[3]), checkpoint)
+    assert isinstance(dict(results)[3], EthereumNodeResponseException)
+    assert [block for block, _ in results] == [1, 2, 3, 4, 5, 6]
+    assert checkpoint.get(f'scan:{ACCOUNT}:1:6:1') == '2'
+
+    transport = BlocksNode()
+    assert [block for block, _ in scan(transport, checkpoint)] == [3, 4, 5, 6]
+    assert transport.blocks == [3, 4, 5, 6]
+
+
+def test_interrupted_scan_resumes_after_the_stored_block(tmp_path):
+    path = str(tmp_path / 'scan.db')
+    results = scan(BlocksNode(), SQLiteCache(path), stop_after=3, concurrency=1)
+    assert [block for block, _ in results] == [1, 2, 3]
+
+    # the checkpoint only moves once the next block is asked for, so the last yielded block is repeated
+    transport = BlocksNode()
+    resumed = scan(transport, SQLiteCache(path), concurrency=1)
+    assert [block for block, _ in resumed] == [3, 4, 5, 6]
+    assert transport.blocks == [3, 4, 5, 6]
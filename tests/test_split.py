@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fixtures import PROTOCOL_BALANCE
+from defisdk import DeFiSDK, RetryPolicy
+from defisdk.abi import encode_arguments
+from defisdk.decoder import read_array, read_int, read_string
+from defisdk.errors import EthereumNodeResponseException
+from defisdk.repositories.defi import GET_BALANCES, GET_PROTOCOL_BALANCES, GET_PROTOCOL_NAMES
+from tests.transport import ScriptedTransport, error
+
+ACCOUNT = '0x' + '11' * 20
+NAMES = [f'Protocol {i}' for i in range(20)]
+
+
+def requested_names(request):
+    data = bytes.fromhex(request['params'][0]['data'][10:])
+    return read_array(data, read_int(data, 32), read_string, dynamic_elements=True)
+
+
+def protocol_balances(names):
+    balances = [((name, '', '', '', 1), []) for name in names]
+    return '0x' + encode_arguments([[PROTOCOL_BALANCE]], [balances])
+
+
+def node(limit_error, max_names=5):
+    def handler(request):
+        if request['method'] == 'eth_blockNumber':
+            return {'result': '0x10'}
+        data = request['params'][0]['data']
+        if data.startswith(GET_BALANCES.selector):
+            return limit_error
+        if data.startswith(GET_PROTOCOL_NAMES.selector):
+            return {'result': '0x' + encode_arguments([['string']], [NAMES])}
+        assert data.startswith(GET_PROTOCOL_BALANCES.selector)
+        names = requested_names(request)
+        if len(names) > max_names:
+            return limit_error
+        return {'result': protocol_balances(names)}
+    return ScriptedTransport(handler)
+
+
+def get_protocol_balances(transport, block=1):
+    async def run():
+        async with DeFiSDK('http://node', transport=transport, retry_policy=RetryPolicy(retries=0)) as sdk:
+            return await sdk.get_protocol_balances(ACCOUNT, NAMES, block=block)
+    return asyncio.run(run())
+
+
+def eth_call_blocks(transport):
+    return {request['params'][1] for request in transport.requests if request['method'] == 'eth_call'}
+
+
+@pytest.mark.parametrize('limit_error', [
+    error('out of gas'),
+    error('execution reverted', 3),
+    error('response size exceeded'),
+    error('request timed out'),
+])
+def test_chunks_hitting_node_limits_are_split(limit_error):
+    transport = node(limit_error)
+    balances = get_protocol_balances(transport)
+    assert [balance.metadata.name for balance in balances] == NAMES
+    assert all(len(requested_names(request)) <= 5 for request in transport.requests[-4:])
+
+
+def test_unclassified_errors_are_not_split():
+    transport = node(error('header not found'), max_names=0)
+    with pytest.raises(EthereumNodeResponseException):
+        get_protocol_balances(transport)
+    assert len(transport.requests) == 1
+
+
+def test_latest_is_pinned_before_splitting():
+    transport = node(error('out of gas'))
+    assert len(get_protocol_balances(transport, 'latest')) == len(NAMES)
+    assert eth_call_blocks(transport) == {'latest', '0x10'}
+    # only the first, failed, request resolved 'latest'
+    assert transport.requests[0]['params'][1] == 'latest'
+
+
+def test_latest_is_pinned_across_chunks():
+    transport = node(error('out of gas'), max_names=len(NAMES))
+
+    async def run():
+        async with DeFiSDK('http://node', transport=transport, balances_chunk_size=5) as sdk:
+            return await sdk.get_protocol_balances(ACCOUNT, NAMES)
+
+    assert len(asyncio.run(run())) == len(NAMES)
+    assert eth_call_blocks(transport) == {'0x10'}
+
+
+def test_split_account_balance_is_one_snapshot():
+    transport = node(error('out of gas'))
+
+    async def run():
+        async with DeFiSDK('http://node', transport=transport, split_balances=True) as sdk:
+            return await sdk.get_account_balance(ACCOUNT)
+
+    asyncio.run(run())
+    blocks = [request['params'][1] for request in transport.requests if request['method'] == 'eth_call']
+    # the full getBalances attempt, then names and chunks pinned to one block
+    assert blocks[0] == 'latest'
+    assert set(blocks[1:]) == {'0x10'}
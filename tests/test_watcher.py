@@ -0,0 +1,104 @@
+import asyncio
+import ast
+from decimal import Decimal
+
+from defisdk.entities import (
+    AdapterBalance,
+    AdapterMetadata,
+    AssetBalance,
+    ProtocolBalance,
+    ProtocolMetadata,
+    TokenBalance,
+    TokenMetadata
+)
+from defisdk.errors import EthereumNodeTimeout
+from defisdk.watcher import BalanceWatcher
+
+ACCOUNT = '0x' + '1' * 40
+ADAPTER = '0x' + 'a' * 40
+DAI = '0x' + 'd' * 40
+USDC = '0x' + 'c' * 40
+
+
+def asset(token: str, balance: int) -> AssetBalance:
+    return AssetBalance(TokenBalance(TokenMetadata(token, token, token, 18), Decimal(balance)), ())
+
+
+def protocol_balances(balances):
+    adapter = AdapterBalance(AdapterMetadata(ADAPTER, 'Asset'), tuple(asset(*item) for item in balances.items()))
+    return [ProtocolBalance(ProtocolMetadata('Aave', '', '', '', 1), (adapter,))]
+
+
+def watcher(blocks, responses):
+    # responses maps a block to the account's raw response, a block that is missing fails the fetch
+    blocks = iter(blocks)
+    decoded = []
+
+    async def get_block_number():
+        block = next(blocks)
+        if isinstance(block, Exception):
+            raise block
+        return block
+
+    async def fetch(account, block):
+        if block not in responses:
+            raise EthereumNodeTimeout()
+        return repr(responses[block])
+
+    async def decode(response):
+        decoded.append(response)
+        return protocol_balances(ast.literal_eval(response))
+
+    return BalanceWatcher(get_block_number, fetch, decode, [ACCOUNT], poll_interval=0), decoded
+
+
+def test_poll_yields_position_changes():
+    balance_watcher, decoded = watcher(
+        [1, 2, 2, 3, 4],
+        {1: {DAI: 1}, 2: {DAI: 1}, 3: {DAI: 2, USDC: 5}, 4: {USDC: 5}}
+    )
+
+    async def run():
+        return [[(c.block, c.token, c.old, c.new) for c in await balance_watcher.poll()] for _ in range(5)]
+
+    assert asyncio.run(run()) == [
+        [(1, DAI, None, asset(DAI, 1))],
+        [],
+        [],
+        [(3, DAI, asset(DAI, 1), asset(DAI, 2)), (3, USDC, None, asset(USDC, 5))],
+        [(4, DAI, asset(DAI, 2), None)]
+    ]
+    # an unchanged response is not decoded again
+    assert len(decoded) == 3
+
+
+def test_failed_fetch_keeps_the_last_snapshot():
+    balance_watcher, _ = watcher([1, 2, 3], {1: {DAI: 1}, 3: {DAI: 2}})
+
+    async def run():
+        first, second = await balance_watcher.poll(), await balance_watcher.poll()
+        errors = dict(balance_watcher.errors)
+        return first, second, errors, await balance_watcher.poll()
+
+    first, second, errors, third = asyncio.run(run())
+    assert [change.new for change in first] == [asset(DAI, 1)]
+    assert second == []
+    assert isinstance(errors[ACCOUNT], EthereumNodeTimeout)
+    assert [(change.old, change.new) for change in third] == [(asset(DAI, 1), asset(DAI, 2))]
+    assert balance_watcher.errors == {}
+
+
+def test_stream_survives_node_errors():
+    balance_watcher, _ = watcher([1, EthereumNodeTimeout(), 2], {1: {DAI: 1}, 2: {DAI: 3}})
+
+    async def run():
+        changes = []
+        async for change in balance_watcher:
+            changes.append(change)
+            if len(changes) == 2:
+                return changes
+
+    first, second = asyncio.run(run())
+    assert (first.block, first.new) == (1, asset(DAI, 1))
+    assert (second.block, second.old, second.new) == (2, asset(DAI, 1), asset(DAI, 3))
+    assert balance_watcher.poll_error is None
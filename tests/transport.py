@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Callable, Dict, List
+
+from defisdk.repositories.base import BaseTransport
+
+
+class ScriptedTransport(BaseTransport):
+    # answers every JSON-RPC request with handler(request) and keeps the POSTed bodies for assertions
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Dict[str, Any]], delay: float = 0):
+        self.handler = handler
+        self.delay = delay
+        self.posts: List[Any] = []
+
+    @property
+    def requests(self) -> List[Dict[str, Any]]:
+        return [request for post in self.posts for request in (post if isinstance(post, list) else [post])]
+
+    async def post(self, send, url: str, headers: Dict[str, str], data: Any) -> Any:
+        self.posts.append(data)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if isinstance(data, list):
+            return [self._answer(request) for request in data]
+        return self._answer(data)
+
+    def _answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {'jsonrpc': '2.0', 'id': request.get('id'), **self.handler(request)}
+
+
+class NodesTransport(BaseTransport):
+    # routes every POST to the transport of the node it is sent to
+
+    def __init__(self, transports: Dict[str, BaseTransport]):
+        self.transports = transports
+
+    async def post(self, send, url: str, headers: Dict[str, str], data: Any) -> Any:
+        return await self.transports[url].post(send, url, headers, data)
+
+
+def error(message: str, code: int = -32000) -> Dict[str, Any]:
+    return {'error': {'code': code, 'message': message}}